@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the profile stats pipeline (no network access).
+
+Usage:
+  python scripts/benchmark_profile_stats.py [heatmap] [metrics]
+
+heatmap: render time and file size of the contribution heatmap for 1-, 5- and
+10-year ranges, next to the size a naive one-<rect>-per-day SVG would have.
+
+metrics: time the fused wrapped-metric engine over 10 years of synthetic days
+with an increasing number of registered metrics. A probe metric counts the
+day updates it receives; the run fails unless that equals one sweep over the
+history, however many metrics are enabled.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from array import array
+from dataclasses import replace
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from profile_stats.renderer import HEATMAP_COLORS, SvgRendererImpl
+from profile_stats.types import (
+    ContributionCalendar,
+    ContributionStats,
+    ProfileStatsData,
+    WrappedMetrics,
+)
+from profile_stats.wrapped import METRICS, Metric, WrappedAggregator, enabled_metrics
+
+
+def _synthetic_days(years: int, seed: int = 7) -> list[tuple[str, int]]:
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=365 * years)
+    return [
+        ((start + timedelta(days=i)).isoformat(), rng.choice((0, 0, 1, 2, 3, 5, 8)))
+        for i in range(365 * years)
+    ]
+
+
+# Counts the days fed into each period; more than one per day means an extra sweep.
+_SWEEP_PROBE = Metric(
+    name="sweep_probe", label="Sweep probe", init=int,
+    update=lambda state, day, count: state + 1, finalize=int,
+)
+
+
+def bench_metrics(years: int = 10, repeat: int = 5) -> None:
+    days = _synthetic_days(years)
+    everything = list(METRICS.values())
+    # Clones of the built-ins stand in for a large registry of user metrics.
+    clones = [replace(m, name=f"{m.name}_{i}") for i in range(4) for m in everything]
+    suites = {
+        "core": enabled_metrics(),
+        "all built-in": everything,
+        "built-in + clones": everything + clones,
+    }
+    print(f"{len(days)} days ({years} years), best of {repeat}")
+    print(f"{'metrics':<20}{'count':>6}{'sweeps':>8}{'ms':>10}{'us/metric/day':>15}")
+    for name, metrics in suites.items():
+        best = float("inf")
+        sweeps = 0.0
+        for _ in range(repeat):
+            agg = WrappedAggregator(
+                past_year_start=date.today() - timedelta(days=365), metrics=metrics + [_SWEEP_PROBE],
+            )
+            t0 = time.perf_counter()
+            agg.add_days(iter(days))  # one-shot: a second pass over the input would see nothing
+            periods = agg.results()
+            best = min(best, time.perf_counter() - t0)
+            all_time = periods["all_time"].metrics["sweep_probe"]
+            per_year = sum(p.metrics["sweep_probe"] for key, p in periods.items() if key.isdigit())
+            if all_time != len(days) or per_year != len(days):
+                raise SystemExit(
+                    f"{name}: expected one sweep of {len(days)} days, "
+                    f"probe saw {all_time} all-time and {per_year} across years"
+                )
+            sweeps = all_time / len(days)
+        per = best * 1e6 / ((len(metrics) + 1) * len(days))
+        print(f"{name:<20}{len(metrics):>6}{sweeps:>8g}{best * 1e3:>10.2f}{per:>15.3f}")
+
+
+def _naive_heatmap_bytes(counts: list[int]) -> int:
+    """Size of the cell markup if every day were an inline-attribute <rect>."""
+    return sum(
+        len(
+            f'<rect x="{(i // 7) * 12}" y="{(i % 7) * 12}" width="10" height="10" rx="2" '
+            f'fill="{HEATMAP_COLORS[min(c, 4)]}" stroke="none"/>\n'
+        )
+        for i, c in enumerate(counts)
+    )
+
+
+def bench_heatmap(repeat: int = 5) -> None:
+    days = _synthetic_days(10)
+    data = ProfileStatsData(
+        contribution=ContributionStats(past_year=0, total=0),
+        languages=[],
+        wrapped=WrappedMetrics("—", 0, "—", "—", "—", "—"),
+        calendar=ContributionCalendar(start=days[0][0], counts=array("I", (c for _, c in days))),
+    )
+    renderer = SvgRendererImpl()
+    print(f"best of {repeat}")
+    print(f"{'years':<8}{'ms':>10}{'bytes':>12}{'naive bytes':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for years in (1, 5, 10):
+            path = Path(tmp) / f"heatmap-{years}.svg"
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                renderer.render_heatmap(data, path, years=years)
+                best = min(best, time.perf_counter() - t0)
+            naive = _naive_heatmap_bytes([c for _, c in days[-365 * years:]])
+            print(f"{years:<8}{best * 1e3:>10.2f}{path.stat().st_size:>12}{naive:>14}")
+
+
+BENCHMARKS = {"heatmap": bench_heatmap, "metrics": bench_metrics}
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run profile stats micro-benchmarks")
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help=f"Benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or sorted(BENCHMARKS):
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
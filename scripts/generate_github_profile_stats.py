@@ -1,13 +1,53 @@
 #!/usr/bin/env python3
-"""Generate GitHub profile stats SVGs (contributions + language, wrapped metrics).
+"""Generate GitHub profile stats SVGs (contributions + language, wrapped metrics, heatmap).
 
 Reads GITHUB_TOKEN or GH_TOKEN from the environment for API access. Optional
-config YAML can override rank, power level, and other metrics.
+config YAML can override rank, power level, and other metrics. Optional wrapped
+metrics are toggled with a `metrics:` mapping (e.g. `weekend_ratio: true`) and
+any metric can be pinned with `metric_overrides:`.
+
+With --ranking fleet, universal rank and power level are percentiles within
+the users processed this month (each counted once), kept in a mergeable
+quantile sketch file (--rank-sketch) together with a Bloom filter of the
+users already counted; last month's sketch answers until this month has
+enough users. Parallel workers rank against the shared sketch but pass
+--fresh-sketch PATH to write only the users they added (leaving
+--rank-sketch untouched); a coordinator run then folds each of those files
+into the shared sketch exactly once with --merge-sketch.
+
+With --daemon the script keeps running and refreshes each section (calendar,
+total, languages, activity) on its own interval (--refresh SECTION=DURATION,
+with --jitter), most-stale and most-active users first, within a global
+--requests-per-hour budget. The wrapped card and heatmap follow the total
+section. With several usernames, SVGs go to <output-dir>/<username>.
+
+--export PATH streams every user's computed stats to a JSON Lines or CSV
+file ("-" for stdout) as each user completes; format and compression
+(gzip/bz2/xz) follow the file name unless --export-format/--export-compress
+are given. Add --no-svg to export without rendering cards.
+
+--org ORG (optionally with --team SLUG) instead aggregates the language
+distribution across all of the organization's (or team's) non-fork
+repositories and renders it as <output-dir>/<org>[-<team>]-language-stats.svg.
+
+Each complete run appends its numbers to a per-user columnar history under
+--history-dir; the stored totals drive the sparkline on the stats card.
+
+The all-time contribution backfill is checkpointed under --state-dir so an
+interrupted run resumes where it stopped. If the total is still partial or
+the languages could not be fetched, existing SVGs are left untouched and the
+script exits non-zero.
 
 Usage:
-  python scripts/generate_github_profile_stats.py [--config PATH] [--output-dir DIR] [USERNAME]
+  python scripts/generate_github_profile_stats.py [--config PATH] [--output-dir DIR] [--state-dir DIR]
+      [--max-commit-pages N] [--ranking {tiers,fleet}] [--rank-sketch PATH]
+      [--merge-sketch PATH ... | --fresh-sketch PATH] [--heatmap-years N] [--history-dir DIR]
+      [--daemon] [--refresh SECTION=DURATION ...] [--jitter F] [--requests-per-hour N]
+      [--export PATH] [--export-format {jsonl,csv}] [--export-compress {gzip,bz2,xz}] [--no-svg]
+      [--org ORG [--team SLUG] [--org-max-pages N]]
+      [USERNAME ...]
 
-Defaults: output-dir=images, username from GITHUB_ACTOR or a fallback.
+Defaults: output-dir=images, state-dir=.cache/profile-stats, username from GITHUB_ACTOR or a fallback.
 """
 from __future__ import annotations
 
@@ -15,23 +55,91 @@ import argparse
 import os
 import sys
 from pathlib import Path
+from typing import Optional
 
 # Allow running from repo root with PYTHONPATH=scripts
 sys.path.insert(0, str(Path(__file__).resolve().parent))
-from profile_stats.contracts import render_all
+from profile_stats.contracts import StatsExporter, render_all
+from profile_stats.exporter import COMPRESSIONS, FORMATS, open_exporter
 from profile_stats.fetcher import GitHubDataFetcher
+from profile_stats.history import append_history, read_totals
+from profile_stats.ranking import FleetRanking
 from profile_stats.renderer import SvgRendererImpl
+from profile_stats.scheduler import DEFAULT_POLICIES, RefreshScheduler, SectionPolicy, parse_duration
+from profile_stats.types import ProfileStatsData
+
+
+def _write_outputs(
+    data: ProfileStatsData,
+    username: str,
+    output_dir: Path,
+    history_dir: Path,
+    heatmap_years: int,
+    render: bool = True,
+) -> int:
+    """Record history and render the SVGs for one user; 1 if partial data would overwrite SVGs."""
+    if data.contribution.total_complete:
+        append_history(history_dir, username, data)
+    data.total_history = read_totals(history_dir, username)
+    if not render:
+        return 0
+    partial = [
+        name for name, complete in (
+            ("all-time contribution total", data.contribution.total_complete),
+            ("languages", data.languages_complete),
+        ) if not complete
+    ]
+    if partial:
+        existing = [
+            p for p in (
+                output_dir / "mohamed-rekiba-github-stats.svg",
+                output_dir / "mohamed-rekiba-github-wrapped-stats.svg",
+                output_dir / "mohamed-rekiba-github-heatmap.svg",
+            ) if p.exists()
+        ]
+        if existing:
+            print(
+                f"Error: {' and '.join(partial)} for {username} incomplete; keeping existing SVGs. "
+                "Re-run to resume.",
+                file=sys.stderr,
+            )
+            return 1
+    output_dir.mkdir(parents=True, exist_ok=True)
+    renderer = SvgRendererImpl()
+    render_all(renderer, data, output_dir, heatmap_years=heatmap_years)
+    print(
+        f"Wrote {output_dir / 'mohamed-rekiba-github-stats.svg'}, "
+        f"{output_dir / 'mohamed-rekiba-github-wrapped-stats.svg'} and "
+        f"{output_dir / 'mohamed-rekiba-github-heatmap.svg'}"
+    )
+    return 0
+
 
+def _parse_refresh(values: list[str], jitter: float) -> dict[str, SectionPolicy]:
+    policies = {
+        name: SectionPolicy(policy.interval, jitter, policy.cost)
+        for name, policy in DEFAULT_POLICIES.items()
+    }
+    for value in values:
+        section, _, duration = value.partition("=")
+        if section not in DEFAULT_POLICIES:
+            raise ValueError(f"unknown section {section!r} (choose from {', '.join(DEFAULT_POLICIES)})")
+        policies[section] = SectionPolicy(parse_duration(duration), jitter, DEFAULT_POLICIES[section].cost)
+    return policies
 
-def main() -> int:
+
+def main(argv: Optional[list[str]] = None) -> int:
     parser = argparse.ArgumentParser(
-        description="Generate mohamed-rekiba-github-stats.svg and mohamed-rekiba-github-wrapped-stats.svg",
+        description=(
+            "Generate mohamed-rekiba-github-stats.svg, mohamed-rekiba-github-wrapped-stats.svg "
+            "and mohamed-rekiba-github-heatmap.svg"
+        ),
     )
     parser.add_argument(
-        "username",
-        nargs="?",
-        default=os.environ.get("GITHUB_ACTOR", "mohamed-rekiba"),
-        help="GitHub username to fetch stats for",
+        "usernames",
+        nargs="*",
+        metavar="username",
+        help="GitHub username(s) to fetch stats for (default: GITHUB_ACTOR or mohamed-rekiba)",
     )
     parser.add_argument(
         "--config",
@@ -45,24 +153,256 @@ def main() -> int:
         default=Path("images"),
         help="Directory to write SVG files into (default: images)",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--state-dir",
+        type=Path,
+        default=Path(".cache/profile-stats"),
+        help="Directory for resumable backfill checkpoints (default: .cache/profile-stats)",
+    )
+    parser.add_argument(
+        "--max-commit-pages",
+        type=int,
+        default=30,
+        help="Cap on commit-history pages per user for hour/repository activity; 0 disables (default: 30)",
+    )
+    parser.add_argument(
+        "--ranking",
+        choices=("tiers", "fleet"),
+        default="tiers",
+        help="Rank against fixed tiers or as a percentile of the processed fleet (default: tiers)",
+    )
+    parser.add_argument(
+        "--rank-sketch",
+        type=Path,
+        default=None,
+        help="Fleet quantile sketch file (default: <state-dir>/fleet-rank.json)",
+    )
+    parser.add_argument(
+        "--merge-sketch",
+        type=Path,
+        action="append",
+        default=[],
+        help="Worker sketch (from --fresh-sketch) to merge into --rank-sketch once (repeatable)",
+    )
+    parser.add_argument(
+        "--fresh-sketch",
+        type=Path,
+        default=None,
+        help="Worker mode: save only the users added by this run to PATH instead of updating --rank-sketch",
+    )
+    parser.add_argument(
+        "--heatmap-years",
+        type=int,
+        default=1,
+        help="Years of history shown on the contribution heatmap (default: 1)",
+    )
+    parser.add_argument(
+        "--history-dir",
+        type=Path,
+        default=None,
+        help="Directory for the daily stats history (default: <state-dir>/history)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and refresh each section on its own schedule",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="append",
+        default=[],
+        metavar="SECTION=DURATION",
+        help=(
+            "Daemon refresh interval for a section, e.g. calendar=6h or languages=7d (repeatable; "
+            "defaults: calendar=6h, total=1d, languages=7d, activity=1d)"
+        ),
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="Daemon refresh jitter as a fraction of each interval (default: 0.1)",
+    )
+    parser.add_argument(
+        "--requests-per-hour",
+        type=int,
+        default=4000,
+        help="Daemon cap on GitHub GraphQL requests per hour across all users (default: 4000)",
+    )
+    parser.add_argument(
+        "--export",
+        default=None,
+        metavar="PATH",
+        help="Stream computed stats for every user to PATH as JSON Lines or CSV ('-' for stdout)",
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=FORMATS,
+        default=None,
+        help="Export format (default: from the --export file name, else jsonl)",
+    )
+    parser.add_argument(
+        "--export-compress",
+        choices=COMPRESSIONS,
+        default=None,
+        help="Compress the export stream (default: from a .gz/.bz2/.xz suffix)",
+    )
+    parser.add_argument(
+        "--no-svg",
+        action="store_true",
+        help="Skip rendering the SVG cards (e.g. when only exporting)",
+    )
+    parser.add_argument(
+        "--org",
+        default=None,
+        help="Aggregate the language distribution of this organization's repositories instead of users",
+    )
+    parser.add_argument(
+        "--team",
+        default=None,
+        metavar="SLUG",
+        help="With --org, only the repositories of this team",
+    )
+    parser.add_argument(
+        "--org-max-pages",
+        type=int,
+        default=1000,
+        help="Cap on 100-repository pages read for --org (default: 1000)",
+    )
+    args = parser.parse_args(argv)
+    if args.team and not args.org:
+        parser.error("--team requires --org")
+    if args.fresh_sketch and args.merge_sketch:
+        parser.error("--fresh-sketch (worker) and --merge-sketch (coordinator) are exclusive")
+    if args.export == "-" and not args.no_svg:
+        parser.error("--export - writes to stdout and requires --no-svg")
+    usernames = args.usernames or [os.environ.get("GITHUB_ACTOR", "mohamed-rekiba")]
+    try:
+        policies = _parse_refresh(args.refresh, args.jitter)
+    except ValueError as e:
+        parser.error(str(e))
     config_path = Path(args.config) if args.config else None
     if config_path is not None and not config_path.exists():
         print(f"Warning: config file not found: {config_path}", file=sys.stderr)
         config_path = None
-    fetcher = GitHubDataFetcher()
+    ranking = None
+    sketch_path = args.rank_sketch or args.state_dir / "fleet-rank.json"
+    if args.ranking == "fleet":
+        ranking = FleetRanking.load(sketch_path)
+        for other in args.merge_sketch:
+            ranking.merge(FleetRanking.load(other))
+        if args.fresh_sketch:
+            ranking.delta = FleetRanking()
+    fetcher = GitHubDataFetcher(
+        state_dir=args.state_dir,
+        max_commit_pages=args.max_commit_pages,
+        ranking=ranking,
+    )
+    exporter = (
+        open_exporter(args.export, args.export_format, args.export_compress) if args.export else None
+    )
     try:
-        data = fetcher.fetch(args.username, config_path=config_path)
-    except Exception as e:
-        print(f"Error fetching data: {e}", file=sys.stderr)
-        return 1
-    output_dir = Path(args.output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    renderer = SvgRendererImpl()
-    render_all(renderer, data, output_dir)
-    print(f"Wrote {output_dir / 'mohamed-rekiba-github-stats.svg'} and {output_dir / 'mohamed-rekiba-github-wrapped-stats.svg'}")
+        if args.org:
+            return _run_org(args, fetcher, exporter)
+        return _run(args, usernames, policies, fetcher, ranking, sketch_path, config_path, exporter)
+    finally:
+        if exporter is not None:
+            exporter.close()
+
+
+def _run_org(args: argparse.Namespace, fetcher: GitHubDataFetcher, exporter: Optional[StatsExporter]) -> int:
+    """Render (and export) the org/team language distribution."""
+    name = f"{args.org}-{args.team}" if args.team else args.org
+    data = fetcher.fetch_organization(args.org, args.team, max_pages=args.org_max_pages)
+    if exporter is not None:
+        exporter.write(f"{args.org}/{args.team}" if args.team else args.org, data)
+    if args.no_svg:
+        return 0
+    output_path = Path(args.output_dir) / f"{name}-language-stats.svg"
+    if not data.languages_complete:
+        if output_path.exists():
+            print(
+                f"Error: language distribution for {name} is partial; keeping existing {output_path}. "
+                "Re-run once the API recovers.",
+                file=sys.stderr,
+            )
+            return 1
+        print(f"Warning: language distribution for {name} is partial", file=sys.stderr)
+    SvgRendererImpl().render_stats(data, output_path)
+    print(f"Wrote {output_path}")
     return 0
 
 
+def _run(
+    args: argparse.Namespace,
+    usernames: list[str],
+    policies: dict[str, SectionPolicy],
+    fetcher: GitHubDataFetcher,
+    ranking: Optional[FleetRanking],
+    sketch_path: Path,
+    config_path: Optional[Path],
+    exporter: Optional[StatsExporter],
+) -> int:
+    """One pass over usernames, or the refresh daemon; records go to exporter as each user completes."""
+    history_dir = args.history_dir or args.state_dir / "history"
+
+    def save_ranking() -> None:
+        if ranking is None:
+            return
+        if ranking.delta is not None:
+            ranking.delta.save(args.fresh_sketch)
+        else:
+            ranking.save(sketch_path)
+
+    def output_dir_for(username: str) -> Path:
+        return Path(args.output_dir) / username if len(usernames) > 1 else Path(args.output_dir)
+
+    if args.daemon:
+        def on_update(username: str, data: ProfileStatsData) -> None:
+            save_ranking()
+            if exporter is not None:
+                exporter.write(username, data)
+                exporter.flush()
+            _write_outputs(
+                data, username, output_dir_for(username), history_dir, args.heatmap_years,
+                render=not args.no_svg,
+            )
+
+        scheduler = RefreshScheduler(
+            fetcher,
+            usernames,
+            policies=policies,
+            requests_per_hour=args.requests_per_hour,
+            on_update=on_update,
+            state_path=args.state_dir / "scheduler.json",
+            config_path=config_path,
+        )
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    status = 0
+    for username in usernames:
+        try:
+            data = fetcher.fetch(username, config_path=config_path)
+        except Exception as e:
+            # One user's failure must not abandon the rest of the batch.
+            print(f"Error fetching data for {username}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        save_ranking()
+        if exporter is not None:
+            exporter.write(username, data)
+        status = max(status, _write_outputs(
+            data, username, output_dir_for(username), history_dir, args.heatmap_years,
+            render=not args.no_svg,
+        ))
+        # The daemon reuses cached sections; a batch must not keep every user it has seen.
+        fetcher.forget(username)
+    return status
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,6 +1,6 @@
 """Contracts (interfaces) for profile stats generation.
 
-Implementations: GitHub API fetcher, SVG renderers. No implementation bodies here.
+Implementations: GitHub API fetcher, SVG renderers, stats exporters. No implementation bodies here.
 """
 from __future__ import annotations
 
@@ -29,7 +29,7 @@ class DataFetcher(ABC):
 
 
 class SvgRenderer(ABC):
-    """Renders one or both SVGs to the filesystem."""
+    """Renders the profile SVG cards to the filesystem."""
 
     @abstractmethod
     def render_wrapped(self, data: ProfileStatsData, output_path: Path) -> None:
@@ -41,9 +41,47 @@ class SvgRenderer(ABC):
         """Write the contribution + language stats SVG to output_path."""
         ...
 
+    @abstractmethod
+    def render_heatmap(self, data: ProfileStatsData, output_path: Path, years: int = 1) -> None:
+        """Write the contribution heatmap SVG for the last `years` years to output_path."""
+        ...
+
+
+class StatsExporter(ABC):
+    """Streams computed stats to a tabular/record sink (JSON Lines, CSV), one user at a time.
+
+    Usable as a context manager; leaving the block closes the underlying stream.
+    """
 
-def render_all(renderer: SvgRenderer, data: ProfileStatsData, output_dir: Path) -> None:
-    """Convenience: render both SVGs into output_dir with fixed filenames."""
+    @abstractmethod
+    def write(self, username: str, data: ProfileStatsData) -> None:
+        """Write one record for username. Nothing is retained after the call."""
+        ...
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Push buffered records to the sink (e.g. between daemon refreshes)."""
+        ...
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish the stream (flush compression trailers) and close it."""
+        ...
+
+    def __enter__(self) -> "StatsExporter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def render_all(
+    renderer: SvgRenderer,
+    data: ProfileStatsData,
+    output_dir: Path,
+    heatmap_years: int = 1,
+) -> None:
+    """Convenience: render all SVG cards into output_dir with fixed filenames."""
     output_dir = Path(output_dir)
     renderer.render_wrapped(
         data,
@@ -53,3 +91,8 @@ def render_all(renderer: SvgRenderer, data: ProfileStatsData, output_dir: Path)
         data,
         output_dir / "mohamed-rekiba-github-stats.svg",
     )
+    renderer.render_heatmap(
+        data,
+        output_dir / "mohamed-rekiba-github-heatmap.svg",
+        years=heatmap_years,
+    )
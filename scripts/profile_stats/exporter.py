@@ -0,0 +1,168 @@
+"""Streaming JSON Lines / CSV export of computed profile stats.
+
+Each user becomes one record written as soon as it is passed in; nothing is
+kept after write(), so a batch of any size streams in constant memory. The
+output can be a file or stdout ("-"), optionally compressed with gzip, bz2
+or xz (inferred from a .gz/.bz2/.xz suffix, or set explicitly).
+"""
+from __future__ import annotations
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import sys
+from pathlib import Path
+from typing import IO, Any, Optional, Union
+
+from .contracts import StatsExporter
+from .types import ProfileStatsData
+
+FORMATS = ("jsonl", "csv")
+COMPRESSIONS = ("gzip", "bz2", "xz")
+_COMPRESS_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+CSV_FIELDS = [
+    "username",
+    "past_year_contributions",
+    "total_contributions",
+    "total_complete",
+    "languages_complete",
+    "repositories",  # org/team cards only; empty for users
+    "universal_rank",
+    "longest_streak_days",
+    "most_active_month",
+    "most_active_day",
+    "top_language",
+    "power_level",
+    "languages",  # "Go:60.0;Python:40.0"
+    "most_active_hour",
+    "top_repository",
+    "metrics",  # JSON object of optional metric rows (label -> value)
+]
+
+
+def stats_record(username: str, data: ProfileStatsData) -> dict[str, Any]:
+    """JSON-ready record of everything shown on the cards for one user."""
+    w = data.wrapped
+    activity = data.activity
+    return {
+        "username": username,
+        "past_year_contributions": data.contribution.past_year,
+        "total_contributions": data.contribution.total,
+        "total_complete": data.contribution.total_complete,
+        "languages_complete": data.languages_complete,
+        "repositories": data.repositories,
+        "universal_rank": w.universal_rank,
+        "longest_streak_days": w.longest_streak_days,
+        "most_active_month": w.most_active_month,
+        "most_active_day": w.most_active_day,
+        "top_language": w.top_language,
+        "power_level": w.power_level,
+        "metrics": dict(w.extra),
+        "languages": [{"name": e.name, "percent": e.percent} for e in data.languages],
+        "periods": {key: dict(period.metrics) for key, period in data.periods.items()},
+        "activity": None if activity is None else {
+            "most_active_hour": activity.most_active_hour,
+            "hour_histogram": list(activity.hour_histogram),
+            "top_repositories": [
+                {"name": name, "commits": commits} for name, commits in activity.top_repositories
+            ],
+            "complete": activity.complete,
+        },
+    }
+
+
+class _StreamExporter(StatsExporter):
+    """Owns the byte sink -> optional compressor -> text wrapper stack."""
+
+    def __init__(self, target: Union[str, Path], compress: Optional[str] = None) -> None:
+        if compress is not None and compress not in COMPRESSIONS:
+            raise ValueError(f"unknown compression {compress!r} (choose from {', '.join(COMPRESSIONS)})")
+        self._owns_raw = str(target) != "-"
+        self._raw: IO[bytes] = open(target, "wb") if self._owns_raw else sys.stdout.buffer
+        self._compressor: Optional[IO[bytes]] = None
+        if compress == "gzip":
+            self._compressor = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif compress == "bz2":
+            self._compressor = bz2.BZ2File(self._raw, "wb")
+        elif compress == "xz":
+            self._compressor = lzma.LZMAFile(self._raw, "wb")
+        self.stream = io.TextIOWrapper(self._compressor or self._raw, encoding="utf-8", newline="")
+        self.count = 0
+        self._closed = False
+
+    def flush(self) -> None:
+        self.stream.flush()
+        if self._compressor is not None:
+            self._compressor.flush()
+        self._raw.flush()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.stream.flush()
+        self.stream.detach()  # closing the wrapper would also close stdout
+        if self._compressor is not None:
+            self._compressor.close()  # writes the trailer; leaves _raw open
+        if self._owns_raw:
+            self._raw.close()
+        else:
+            self._raw.flush()
+
+
+class JsonLinesExporter(_StreamExporter):
+    """One JSON object per line (see stats_record)."""
+
+    def write(self, username: str, data: ProfileStatsData) -> None:
+        self.stream.write(json.dumps(stats_record(username, data), separators=(",", ":"), ensure_ascii=False, default=str))
+        self.stream.write("\n")
+        self.count += 1
+
+
+class CsvExporter(_StreamExporter):
+    """Flat CSV with a header row (see CSV_FIELDS); nested fields are folded into strings."""
+
+    def __init__(self, target: Union[str, Path], compress: Optional[str] = None) -> None:
+        super().__init__(target, compress)
+        self._writer = csv.DictWriter(self.stream, fieldnames=CSV_FIELDS)
+        self._writer.writeheader()
+
+    def write(self, username: str, data: ProfileStatsData) -> None:
+        record = stats_record(username, data)
+        activity = record["activity"] or {}
+        repos = activity.get("top_repositories") or []
+        row = {name: record.get(name) for name in CSV_FIELDS}
+        row["languages"] = ";".join(f"{e['name']}:{e['percent']}" for e in record["languages"])
+        row["most_active_hour"] = activity.get("most_active_hour", "")
+        row["top_repository"] = repos[0]["name"] if repos else ""
+        row["metrics"] = json.dumps(record["metrics"], separators=(",", ":"), ensure_ascii=False, default=str)
+        self._writer.writerow(row)
+        self.count += 1
+
+
+def open_exporter(
+    target: Union[str, Path],
+    fmt: Optional[str] = None,
+    compress: Optional[str] = None,
+) -> StatsExporter:
+    """Open an exporter on target ("-" for stdout).
+
+    fmt and compress default from the file name, e.g. stats.csv.gz is gzip CSV;
+    anything unrecognized is uncompressed JSON Lines.
+    """
+    suffixes = [s.lower() for s in Path(str(target)).suffixes]
+    if compress is None and suffixes and suffixes[-1] in _COMPRESS_SUFFIXES:
+        compress = _COMPRESS_SUFFIXES[suffixes[-1]]
+    if suffixes and suffixes[-1] in _COMPRESS_SUFFIXES:
+        suffixes = suffixes[:-1]
+    if fmt is None:
+        fmt = "csv" if suffixes and suffixes[-1] == ".csv" else "jsonl"
+    if fmt == "csv":
+        return CsvExporter(target, compress)
+    if fmt == "jsonl":
+        return JsonLinesExporter(target, compress)
+    raise ValueError(f"unknown export format {fmt!r} (choose from {', '.join(FORMATS)})")
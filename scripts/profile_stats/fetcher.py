@@ -3,27 +3,30 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import urllib.error
 import urllib.request
-from datetime import datetime, timedelta
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
 
 from .contracts import DataFetcher
 from .types import (
+    ActivityStats,
     ConfigOverrides,
+    ContributionCalendar,
     ContributionStats,
     LanguageEntry,
     ProfileStatsData,
     WrappedMetrics,
+    WrappedPeriod,
 )
+from .ranking import MIN_FLEET_SIZE, FleetRanking
+from .wrapped import DailySeries, Metric, WrappedAggregator, enabled_metrics, iter_calendar_days
 
 GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
-MONTH_NAMES = [
-    "January", "February", "March", "April", "May", "June",
-    "July", "August", "September", "October", "November", "December",
-]
-WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 _RANK_TIERS: list[tuple[int, str]] = [
     (1000, "Top 1%"),
     (500, "Top 5%"),
@@ -42,6 +45,15 @@ _POWER_TIERS: list[tuple[int, str]] = [
     (0, "Newcomer"),
 ]
 
+# Fleet mode: power level from the user's power-score percentile within the fleet.
+_POWER_PERCENTILE_TIERS: list[tuple[float, str]] = [
+    (99, "Legendary"),
+    (90, "Pro Mode"),
+    (70, "Grinder"),
+    (40, "Rising Star"),
+    (0, "Newcomer"),
+]
+
 
 def _compute_rank(past_year_contributions: int) -> str:
     for threshold, label in _RANK_TIERS:
@@ -50,20 +62,52 @@ def _compute_rank(past_year_contributions: int) -> str:
     return "Unranked"
 
 
-def _compute_power_level(
+def _power_score(
     total_contributions: int,
     longest_streak: int,
     language_count: int,
-) -> str:
-    """Weighted score from contributions, streak, and language breadth."""
+) -> float:
+    """Weighted score (0-100) from contributions, streak, and language breadth."""
     contrib_score = min(total_contributions / 50, 40)
     streak_score = min(longest_streak / 1.5, 30)
     lang_score = min(language_count * 3, 30)
-    score = contrib_score + streak_score + lang_score
+    return contrib_score + streak_score + lang_score
+
+
+def _compute_power_level(
+    total_contributions: int,
+    longest_streak: int,
+    language_count: int,
+) -> str:
+    """Weighted score from contributions, streak, and language breadth."""
+    score = _power_score(total_contributions, longest_streak, language_count)
     for threshold, label in _POWER_TIERS:
         if score >= threshold:
             return label
     return "Newcomer"
+
+
+def _fleet_rank_and_power(ranking: FleetRanking, past_year: int, power_score: float) -> tuple[str, str]:
+    """Universal rank and power level as true percentiles within the fleet."""
+    rank = f"Top {ranking.top_percent('contributions', past_year)}%"
+    percentile = ranking.percentile("power", power_score)
+    for threshold, label in _POWER_PERCENTILE_TIERS:
+        if percentile >= threshold:
+            return rank, label
+    return rank, "Newcomer"
+
+
+def _record_fleet_user(
+    ranking: FleetRanking,
+    username: str,
+    past_year: int,
+    power_score: float,
+) -> None:
+    """Add the user to the fleet once per calendar-month epoch (keys are kept with the sketch)."""
+    ranking.start_epoch(datetime.utcnow().strftime("%Y-%m"))
+    ranking.add_user(past_year, power_score, user=username)
+
+
 LANGUAGE_COLORS: dict[str, str] = {
     "Go": "#00ADD8",
     "JavaScript": "#f1e05a",
@@ -88,7 +132,19 @@ def _get_token() -> Optional[str]:
     return os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
 
 
+_request_lock = threading.Lock()
+_request_total = 0
+
+
+def request_count() -> int:
+    """GraphQL requests issued by this process so far (used for rate budgeting)."""
+    return _request_total
+
+
 def _graphql(token: str, query: str, variables: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+    global _request_total
+    with _request_lock:
+        _request_total += 1
     req = urllib.request.Request(
         GITHUB_GRAPHQL_URL,
         data=json.dumps({"query": query, "variables": variables or {}}).encode("utf-8"),
@@ -102,6 +158,26 @@ def _graphql(token: str, query: str, variables: Optional[dict[str, Any]] = None)
         return json.loads(resp.read().decode("utf-8"))
 
 
+# Core metrics whose override values feed arithmetic (power score) and the history columns.
+_INT_METRIC_OVERRIDES = ("total", "longest_streak_days")
+
+
+def _config_int(key: str, value: Any) -> Optional[int]:
+    """Whole-number config value; quoted numbers ("42") are accepted, anything else is rejected."""
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ValueError(f"config {key}: expected a whole number, got {value!r}")
+
+
 def _load_config(config_path: Path) -> ConfigOverrides:
     try:
         import yaml
@@ -113,15 +189,26 @@ def _load_config(config_path: Path) -> ConfigOverrides:
         raw = yaml.safe_load(f)
     if not raw or not isinstance(raw, dict):
         return ConfigOverrides()
+    metric_overrides = (
+        dict(raw.get("metric_overrides")) if isinstance(raw.get("metric_overrides"), dict) else {}
+    )
+    for name in _INT_METRIC_OVERRIDES:
+        if name in metric_overrides:
+            metric_overrides[name] = _config_int(f"metric_overrides.{name}", metric_overrides[name])
     return ConfigOverrides(
         universal_rank=raw.get("universal_rank"),
         power_level=raw.get("power_level"),
-        longest_streak_days=raw.get("longest_streak_days"),
+        longest_streak_days=_config_int("longest_streak_days", raw.get("longest_streak_days")),
         most_active_month=raw.get("most_active_month"),
         most_active_day=raw.get("most_active_day"),
         top_language=raw.get("top_language"),
-        past_year_contributions=raw.get("past_year_contributions"),
-        total_contributions=raw.get("total_contributions"),
+        past_year_contributions=_config_int("past_year_contributions", raw.get("past_year_contributions")),
+        total_contributions=_config_int("total_contributions", raw.get("total_contributions")),
+        # Only real YAML booleans toggle a metric; a quoted "false" is ignored, not truthy.
+        metrics={
+            str(k): v for k, v in (raw.get("metrics") or {}).items() if isinstance(v, bool)
+        } if isinstance(raw.get("metrics"), dict) else {},
+        metric_overrides=metric_overrides,
     )
 
 
@@ -148,104 +235,217 @@ query($login: String!, $from: DateTime!, $to: DateTime!) {
 }
 """
 
-_CONTRIBUTIONS_ONLY_QUERY = """
+_CALENDAR_WINDOW_QUERY = """
 query($login: String!, $from: DateTime!, $to: DateTime!) {
   user(login: $login) {
     contributionsCollection(from: $from, to: $to) {
-      contributionCalendar { totalContributions }
+      contributionCalendar {
+        totalContributions
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
     }
   }
 }
 """
 
 
-def _compute_wrapped_from_calendar(weeks: list[Any]) -> tuple[int, str, str]:
-    """From contributionCalendar.weeks compute longest_streak_days, most_active_month, most_active_day."""
-    if not weeks:
-        return 0, "—", "—"
-    days: list[tuple[str, int]] = []
-    for week in weeks:
-        for day in week.get("contributionDays") or []:
-            d = day.get("date")
-            c = int(day.get("contributionCount") or 0)
-            if d:
-                days.append((d, c))
-    days.sort(key=lambda x: x[0])
+def _compute_wrapped_from_calendar(
+    weeks: list[Any],
+    metrics: Optional[list[Metric]] = None,
+) -> dict[str, Any]:
+    """From contributionCalendar.weeks compute every enabled metric in one pass (empty if no days)."""
+    days = sorted(iter_calendar_days(weeks))
     if not days:
-        return 0, "—", "—"
-
-    # Longest streak: max consecutive days with contributionCount > 0
-    longest_streak = 0
-    current_streak = 0
-    for _date, count in days:
-        if count > 0:
-            current_streak += 1
-            longest_streak = max(longest_streak, current_streak)
-        else:
-            current_streak = 0
-
-    # Most active month: aggregate by month (YYYY-MM), find max
-    month_totals: dict[str, int] = {}
-    for date_str, count in days:
-        if len(date_str) >= 7:
-            month_key = date_str[:7]
-            month_totals[month_key] = month_totals.get(month_key, 0) + count
-    if month_totals:
-        best_month_key = max(month_totals, key=month_totals.get)
-        try:
-            y, m = int(best_month_key[:4]), int(best_month_key[5:7])
-            most_active_month = MONTH_NAMES[m - 1] if 1 <= m <= 12 else "—"
-        except (ValueError, IndexError):
-            most_active_month = "—"
-    else:
-        most_active_month = "—"
-
-    # Most active day of week: aggregate by weekday (Monday=0 .. Sunday=6)
-    weekday_totals: list[int] = [0] * 7
-    for date_str, count in days:
-        try:
-            dt = datetime.strptime(date_str, "%Y-%m-%d")
-            weekday_totals[dt.weekday()] += count
-        except (ValueError, IndexError):
-            continue
-    if weekday_totals and max(weekday_totals) > 0:
-        best_weekday_idx = max(range(7), key=lambda i: weekday_totals[i])
-        most_active_day = WEEKDAYS[best_weekday_idx]
-    else:
-        most_active_day = "—"
+        return {}
+    aggregator = WrappedAggregator(past_year_start=date.min, metrics=metrics)
+    aggregator.add_days(days)
+    return aggregator.results()["all_time"].metrics
 
-    return longest_streak, most_active_month, most_active_day
 
+def _contribution_windows(created_dt: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Split [createdAt, end) into consecutive 365-day windows anchored at createdAt.
+
+    Anchoring at createdAt keeps every window except the last one identical
+    between runs, which is what makes them safe to checkpoint.
+    """
+    windows: list[tuple[datetime, datetime]] = []
+    chunk_start = created_dt
+    while chunk_start < end:
+        chunk_end_dt = min(chunk_start + timedelta(days=_DAYS_PER_CHUNK), end)
+        windows.append((chunk_start, chunk_end_dt))
+        chunk_start = chunk_end_dt
+    return windows
+
+
+def _window_key(chunk_start: datetime, chunk_end_dt: datetime) -> str:
+    return f"{chunk_start:%Y-%m-%d}/{chunk_end_dt:%Y-%m-%d}"
+
+
+def _checkpoint_path(state_dir: Path, username: str) -> Path:
+    return Path(state_dir) / f"{username.lower()}-backfill.json"
 
-def _fetch_contributions(token: str, username: str) -> tuple[int, int, list[Any]]:
-    """Return (past_year, total, calendar_weeks). Past year = last 365 days; total = all-time (chunked)."""
-    end = datetime.utcnow()
-    to_str = end.strftime("%Y-%m-%dT23:59:59Z")
-    start_past = end - timedelta(days=365)
-    from_past_str = start_past.strftime("%Y-%m-%dT00:00:00Z")
 
-    # Query 1: user createdAt + past year contributions + calendar weeks (for streak/month/day)
+def _load_checkpoint(path: Path, created_at: str) -> tuple[dict[str, int], dict[str, Any]]:
+    """Load completed window totals and the stream snapshot taken after them.
+
+    The snapshot holds the wrapped-aggregator state ("wrapped") and the daily
+    series ("days"). The file is discarded if it belongs to another account epoch.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}, {}
+    if not isinstance(raw, dict) or raw.get("created_at") != created_at:
+        return {}, {}
+    windows = raw.get("windows")
+    stream = {"wrapped": raw.get("wrapped"), "days": raw.get("days")}
+    if not isinstance(windows, dict) or not all(isinstance(v, dict) for v in stream.values()):
+        return {}, {}
+    return {k: int(v) for k, v in windows.items() if isinstance(v, int)}, stream
+
+
+def _save_checkpoint(
+    path: Path,
+    created_at: str,
+    windows: dict[str, int],
+    stream: dict[str, Any],
+) -> None:
+    """Atomically persist completed window totals (write temp file, then rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {"created_at": created_at, "windows": windows, **stream},
+            f, sort_keys=True,
+        )
+    os.replace(tmp, path)
+
+
+def _fetch_window_calendar(
+    token: str,
+    username: str,
+    chunk_start: datetime,
+    chunk_end_dt: datetime,
+) -> Optional[tuple[int, list[Any]]]:
+    """(totalContributions, calendar weeks) for one window, or None if the request failed."""
+    try:
+        data_chunk = _graphql(
+            token,
+            _CALENDAR_WINDOW_QUERY,
+            {
+                "login": username,
+                "from": chunk_start.strftime("%Y-%m-%dT00:00:00Z"),
+                "to": chunk_end_dt.strftime("%Y-%m-%dT23:59:59Z"),
+            },
+        )
+    except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
+        return None
+    if not data_chunk:
+        return None
+    p = data_chunk.get("data") or {}
+    u = p.get("user")
+    if not u:
+        return None
+    coll = u.get("contributionsCollection") or {}
+    c = coll.get("contributionCalendar") or {}
+    return int(c.get("totalContributions") or 0), c.get("weeks") or []
+
+
+class _Contributions(NamedTuple):
+    past_year: int
+    total: int
+    weeks: list[Any]
+    total_complete: bool
+    periods: dict[str, WrappedPeriod]
+    calendar: Optional[ContributionCalendar]
+
+
+def _past_year_calendar(weeks: list[Any]) -> Optional[ContributionCalendar]:
+    series = DailySeries()
+    series.add_weeks(weeks)
+    return series.calendar()
+
+
+def _past_year_periods(
+    weeks: list[Any],
+    past_year_start: date,
+    metrics: Optional[list[Metric]] = None,
+) -> dict[str, WrappedPeriod]:
+    """Wrapped periods computed from the past-year calendar alone (fallback when the backfill is partial)."""
+    aggregator = WrappedAggregator(past_year_start, metrics)
+    aggregator.add_weeks(weeks)
+    periods = aggregator.results()
+    return {"past_year": periods["past_year"]} if periods else {}
+
+
+class _PastYear(NamedTuple):
+    past_year: int
+    weeks: list[Any]
+    created_at: Optional[str]
+
+
+def _fetch_past_year(token: str, username: str) -> Optional[_PastYear]:
+    """Query 1: past-year total and calendar weeks plus the account's createdAt (None on failure)."""
+    end = datetime.utcnow()
     try:
         data = _graphql(
             token,
             _CONTRIBUTIONS_QUERY,
-            {"login": username, "from": from_past_str, "to": to_str},
+            {
+                "login": username,
+                "from": (end - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z"),
+                "to": end.strftime("%Y-%m-%dT23:59:59Z"),
+            },
         )
     except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
-        return 0, 0, []
+        return None
     if not data:
-        return 0, 0, []
+        return None
     payload = data.get("data") or {}
     user = payload.get("user")
     if not user:
-        return 0, 0, []
+        return None
     collection = user.get("contributionsCollection") or {}
     cal = collection.get("contributionCalendar") or {}
-    past_year = int(cal.get("totalContributions") or 0)
-    weeks = cal.get("weeks") or []
-    created_at = user.get("createdAt")
+    return _PastYear(
+        past_year=int(cal.get("totalContributions") or 0),
+        weeks=cal.get("weeks") or [],
+        created_at=user.get("createdAt"),
+    )
+
+
+def _backfill_contributions(
+    token: str,
+    username: str,
+    past: _PastYear,
+    state_dir: Optional[Path] = None,
+    metrics: Optional[list[Metric]] = None,
+) -> _Contributions:
+    """All-time total, periods and daily calendar by streaming 365-day windows from createdAt.
+
+    Every window's calendar is streamed through a WrappedAggregator, so periods
+    holds all-time, past-year and per-year values of every metric in metrics
+    (default: enabled_metrics()) from one pass over the history. The same
+    stream fills calendar, the per-day counts used by the heatmap.
+
+    When state_dir is set, windows that are sealed and older than the past year
+    are checkpointed there together with the stream snapshot, so an interrupted
+    backfill resumes from the first missing window. total_complete is False when
+    any window could not be fetched and total is therefore a lower bound;
+    periods and calendar then fall back to the past-year calendar.
+    """
+    end = datetime.utcnow()
+    past_year_start = (end - timedelta(days=365)).date()
+    past_year, weeks, created_at = past
+    fallback_periods = _past_year_periods(weeks, past_year_start, metrics)
     if not created_at:
-        return past_year, past_year, weeks
+        return _Contributions(past_year, past_year, weeks, False, fallback_periods, _past_year_calendar(weeks))
 
     # Total: chunk from createdAt to now in 365-day windows and sum (API returns at most ~1 year per query)
     try:
@@ -253,39 +453,241 @@ def _fetch_contributions(token: str, username: str) -> tuple[int, int, list[Any]
         if created_dt.tzinfo is not None:
             created_dt = created_dt.replace(tzinfo=None)  # work in naive UTC like end
     except (ValueError, TypeError):
-        return past_year, past_year, weeks
+        return _Contributions(past_year, past_year, weeks, False, fallback_periods, _past_year_calendar(weeks))
+
+    checkpoint = _checkpoint_path(state_dir, username) if state_dir else None
+    done, stream = _load_checkpoint(checkpoint, created_at) if checkpoint else ({}, {})
+    aggregator = WrappedAggregator.from_state(past_year_start, stream.get("wrapped") or {}, metrics)
+    series = DailySeries.from_state(stream.get("days") or {})
+    if not aggregator.can_resume(stream.get("wrapped") or {}):
+        # Metric set changed since the checkpoint (or there is none); replay the whole history.
+        done, series = {}, DailySeries()
+    saved: dict[str, int] = {}
+    resuming = True
     total = 0
-    chunk_start = created_dt
-    while chunk_start < end:
-        chunk_end_dt = min(chunk_start + timedelta(days=_DAYS_PER_CHUNK), end)
-        from_str = chunk_start.strftime("%Y-%m-%dT00:00:00Z")
-        chunk_to_str = chunk_end_dt.strftime("%Y-%m-%dT23:59:59Z")
+    complete = True
+    for chunk_start, chunk_end_dt in _contribution_windows(created_dt, end):
+        key = _window_key(chunk_start, chunk_end_dt)
+        # The snapshot covers a prefix of windows; stop trusting it at the first gap.
+        if resuming and key in done:
+            total += done[key]
+            saved[key] = done[key]
+            continue
+        resuming = False
+        window = _fetch_window_calendar(token, username, chunk_start, chunk_end_dt)
+        if window is None:
+            complete = False
+            break
+        count, window_weeks = window
+        total += count
+        for date_str, day_count in iter_calendar_days(window_weeks):
+            aggregator.add_day(date_str, day_count)
+            series.add_day(date_str, day_count)
+        # Only sealed windows that end before the past year are stable enough to checkpoint.
+        sealed = chunk_end_dt - chunk_start >= timedelta(days=_DAYS_PER_CHUNK)
+        if checkpoint and sealed and chunk_end_dt.date() < past_year_start:
+            saved[key] = count
+            _save_checkpoint(
+                checkpoint, created_at, saved,
+                {"wrapped": aggregator.to_state(), "days": series.to_state()},
+            )
+
+    if not complete:
+        return _Contributions(
+            past_year, max(total, past_year), weeks, False, fallback_periods, _past_year_calendar(weeks),
+        )
+    return _Contributions(
+        past_year, total if total > 0 else past_year, weeks, True, aggregator.results(), series.calendar(),
+    )
+
+
+def _fetch_contributions(
+    token: str,
+    username: str,
+    state_dir: Optional[Path] = None,
+    metrics: Optional[list[Metric]] = None,
+) -> _Contributions:
+    """Return (past_year, total, weeks, total_complete, periods, calendar).
+
+    Past year = last 365 days (query 1); the rest comes from the checkpointed
+    all-time backfill (see _backfill_contributions).
+    """
+    past = _fetch_past_year(token, username)
+    if past is None:
+        return _Contributions(0, 0, [], False, {}, None)
+    return _backfill_contributions(token, username, past, state_dir, metrics)
+
+
+# Commit activity stage: per-repo commit history, streamed into fixed-size histograms.
+_COMMIT_REPOS_LIMIT = 25
+_COMMIT_PAGE_SIZE = 100
+_DEFAULT_MAX_COMMIT_PAGES = 30
+_COMMIT_WORKERS = 4
+
+_COMMIT_REPOS_QUERY = """
+query($login: String!, $from: DateTime!, $to: DateTime!, $limit: Int!) {
+  user(login: $login) {
+    id
+    contributionsCollection(from: $from, to: $to) {
+      commitContributionsByRepository(maxRepositories: $limit) {
+        repository { name owner { login } }
+        contributions { totalCount }
+      }
+    }
+  }
+}
+"""
+
+_COMMIT_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $author: ID!, $since: GitTimestamp!, $until: GitTimestamp!,
+      $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, after: $after, author: { id: $author }, since: $since, until: $until) {
+            pageInfo { hasNextPage endCursor }
+            nodes { authoredDate }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+class _PageBudget:
+    """Thread-safe cap on commit-history pages fetched for one user."""
+
+    def __init__(self, limit: int) -> None:
+        self._remaining = limit
+        self._lock = threading.Lock()
+        self.exhausted = False
+
+    def take(self) -> bool:
+        with self._lock:
+            if self._remaining <= 0:
+                self.exhausted = True
+                return False
+            self._remaining -= 1
+            return True
+
+
+def _fetch_repo_commit_hours(
+    token: str,
+    owner: str,
+    name: str,
+    author_id: str,
+    since: str,
+    until: str,
+    budget: _PageBudget,
+) -> tuple[array, int]:
+    """Page through one repo's default-branch history; return (24-slot hour histogram, commit count).
+
+    Commits are bucketed by authoredDate (when the work happened), not by when
+    they were committed or rebased. Each page is folded into the histogram and
+    dropped, so memory is O(page size).
+    """
+    hours = array("I", bytes(4 * 24))
+    commits = 0
+    cursor: Optional[str] = None
+    while budget.take():
         try:
-            data_chunk = _graphql(
+            data = _graphql(
                 token,
-                _CONTRIBUTIONS_ONLY_QUERY,
-                {"login": username, "from": from_str, "to": chunk_to_str},
+                _COMMIT_HISTORY_QUERY,
+                {
+                    "owner": owner, "name": name, "author": author_id,
+                    "since": since, "until": until,
+                    "first": _COMMIT_PAGE_SIZE, "after": cursor,
+                },
             )
         except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
             break
-        if not data_chunk:
-            break
-        p = data_chunk.get("data") or {}
-        u = p.get("user")
-        if not u:
-            break
-        coll = u.get("contributionsCollection") or {}
-        c = coll.get("contributionCalendar") or {}
-        total += int(c.get("totalContributions") or 0)
-        chunk_start = chunk_end_dt
-        if chunk_start >= end:
+        repo = ((data or {}).get("data") or {}).get("repository") or {}
+        target = (repo.get("defaultBranchRef") or {}).get("target") or {}
+        history = target.get("history") or {}
+        for node in history.get("nodes") or []:
+            stamp = (node or {}).get("authoredDate") or ""
+            # "YYYY-MM-DDTHH:MM:SSZ": GitHub reports UTC, so the hour is a fixed slice.
+            if len(stamp) >= 13 and stamp[11:13].isdigit():
+                hours[int(stamp[11:13]) % 24] += 1
+                commits += 1
+        page_info = history.get("pageInfo") or {}
+        cursor = page_info.get("endCursor")
+        if not page_info.get("hasNextPage") or not cursor:
             break
+    return hours, commits
+
+
+def _fetch_commit_activity(
+    token: str,
+    username: str,
+    max_pages: int = _DEFAULT_MAX_COMMIT_PAGES,
+    max_workers: int = _COMMIT_WORKERS,
+) -> Optional[ActivityStats]:
+    """Most active hour (UTC) and top repositories by commits over the past year.
 
-    return past_year, total if total > 0 else past_year, weeks
+    Repositories and their commit counts come from commitContributionsByRepository,
+    so the ranking is exact; only the hour histogram needs the histories, which are
+    paged concurrently (at most max_workers requests in flight) under a per-user
+    cap of max_pages pages. Returns None when there is no commit activity; a
+    failed repository query raises, so callers can keep what they had.
+    """
+    if max_pages <= 0:
+        return None
+    end = datetime.utcnow()
+    start = end - timedelta(days=365)
+    data = _graphql(
+        token,
+        _COMMIT_REPOS_QUERY,
+        {
+            "login": username,
+            "from": start.strftime("%Y-%m-%dT00:00:00Z"),
+            "to": end.strftime("%Y-%m-%dT23:59:59Z"),
+            "limit": _COMMIT_REPOS_LIMIT,
+        },
+    )
+    user = ((data or {}).get("data") or {}).get("user")
+    if not user or not user.get("id"):
+        return None
+    repos: list[tuple[str, str, int]] = []
+    for entry in (user.get("contributionsCollection") or {}).get("commitContributionsByRepository") or []:
+        repo = (entry or {}).get("repository") or {}
+        owner = (repo.get("owner") or {}).get("login")
+        count = ((entry or {}).get("contributions") or {}).get("totalCount") or 0
+        if owner and repo.get("name"):
+            repos.append((owner, repo["name"], int(count)))
+    if not repos:
+        return None
+
+    budget = _PageBudget(max_pages)
+    since = start.strftime("%Y-%m-%dT00:00:00Z")
+    until = end.strftime("%Y-%m-%dT23:59:59Z")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(pool.map(
+            lambda r: _fetch_repo_commit_hours(token, r[0], r[1], user["id"], since, until, budget),
+            repos,
+        ))
+    hours = array("I", bytes(4 * 24))
+    for repo_hours, _ in results:
+        for h in range(24):
+            hours[h] += repo_hours[h]
+    if not any(hours):
+        return None
+    best_hour = max(range(24), key=lambda h: hours[h])
+    ranked = sorted(repos, key=lambda r: -r[2])
+    return ActivityStats(
+        most_active_hour=f"{best_hour:02d}:00 UTC",
+        hour_histogram=list(hours),
+        top_repositories=[(f"{owner}/{name}", count) for owner, name, count in ranked[:5] if count > 0],
+        complete=not budget.exhausted,
+    )
 
 
-def _fetch_languages(token: str, username: str) -> list[LanguageEntry]:
-    """Aggregate languages by bytes of code across user's repos."""
+def _fetch_languages(token: str, username: str) -> Optional[list[LanguageEntry]]:
+    """Aggregate languages by bytes of code across user's repos (None when the query failed)."""
     query = """
     query($login: String!) {
       user(login: $login) {
@@ -305,20 +707,28 @@ def _fetch_languages(token: str, username: str) -> list[LanguageEntry]:
     try:
         data = _graphql(token, query, {"login": username})
     except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
-        return []
+        return None
     if not data:
-        return []
+        return None
     payload = data.get("data") or {}
     user = payload.get("user")
     if not user:
-        return []
+        return None
     repos = user.get("repositories") or {}
     nodes = repos.get("nodes") or []
     byte_totals: dict[str, int] = {}
     api_colors: dict[str, str] = {}
+    _add_repo_languages(nodes, byte_totals, api_colors)
+    return _language_entries(byte_totals, api_colors)
+
+
+def _add_repo_languages(nodes: list[Any], byte_totals: dict[str, int], api_colors: dict[str, str]) -> int:
+    """Add each repository node's language sizes into byte_totals; returns repos counted."""
+    counted = 0
     for repo in nodes:
-        if not repo:
+        if not repo or repo.get("isFork"):
             continue
+        counted += 1
         languages = repo.get("languages") or {}
         for edge in languages.get("edges") or []:
             size = int(edge.get("size") or 0)
@@ -330,6 +740,11 @@ def _fetch_languages(token: str, username: str) -> list[LanguageEntry]:
             color = node.get("color")
             if color and name not in api_colors:
                 api_colors[name] = color
+    return counted
+
+
+def _language_entries(byte_totals: dict[str, int], api_colors: dict[str, str]) -> list[LanguageEntry]:
+    """Percent per language by bytes, largest first; languages under 2% fold into "Other"."""
     total_bytes = sum(byte_totals.values())
     if total_bytes == 0:
         return []
@@ -351,47 +766,408 @@ def _fetch_languages(token: str, username: str) -> list[LanguageEntry]:
     return main_entries + [LanguageEntry(name="Other", percent=other_sum, color=FALLBACK_COLOR)]
 
 
+_ORG_PAGE_SIZE = 100
+_ORG_MAX_PAGES = 1000
+_ORG_WORKERS = 4
+
+# __CONNECTION__ is an organization's or a team's repositories; __NODES__ is
+# empty for the cheap cursor walk and the language selection for data pages.
+_ORG_REPOS_QUERY = """
+query($org: String!, $team: String!, $withTeam: Boolean!, $first: Int!, $after: String) {
+  organization(login: $org) {
+    repositories(first: $first, after: $after, isFork: false) @skip(if: $withTeam) {
+      __CONNECTION__
+    }
+    team(slug: $team) @include(if: $withTeam) {
+      repositories(first: $first, after: $after) {
+        __CONNECTION__
+      }
+    }
+  }
+}
+"""
+_ORG_REPO_NODES = """
+      nodes {
+        isFork
+        languages(first: 10, orderBy: { field: SIZE, direction: DESC }) {
+          edges {
+            size
+            node { name color }
+          }
+        }
+      }"""
+_ORG_CURSOR_QUERY = _ORG_REPOS_QUERY.replace("__CONNECTION__", "pageInfo { hasNextPage endCursor }")
+_ORG_PAGE_QUERY = _ORG_REPOS_QUERY.replace(
+    "__CONNECTION__", "pageInfo { hasNextPage endCursor }" + _ORG_REPO_NODES,
+)
+
+
+class _LanguageBytes(NamedTuple):
+    """Partial language aggregate for some pages of an organization's repositories."""
+
+    byte_totals: dict[str, int]
+    api_colors: dict[str, str]
+    repositories: int = 0
+    failed_pages: int = 0
+
+
+class OrgLanguages(NamedTuple):
+    languages: list[LanguageEntry]
+    repositories: int
+    complete: bool  # False if a page failed or the page cap stopped the walk
+
+
+def _org_variables(org: str, team: Optional[str], first: int, after: Optional[str]) -> dict[str, Any]:
+    return {"org": org, "team": team or "", "withTeam": bool(team), "first": first, "after": after}
+
+
+def _org_repositories(data: Any, team: Optional[str]) -> dict[str, Any]:
+    org = ((data or {}).get("data") or {}).get("organization") or {}
+    if team:
+        org = org.get("team") or {}
+    return org.get("repositories") or {}
+
+
+def _merge_language_bytes(a: _LanguageBytes, b: _LanguageBytes) -> _LanguageBytes:
+    """Reduce step: fold the smaller partial into the larger one."""
+    if len(a.byte_totals) < len(b.byte_totals):
+        a, b = b, a
+    for name, size in b.byte_totals.items():
+        a.byte_totals[name] = a.byte_totals.get(name, 0) + size
+    for name, color in b.api_colors.items():
+        a.api_colors.setdefault(name, color)
+    return _LanguageBytes(
+        a.byte_totals, a.api_colors,
+        a.repositories + b.repositories, a.failed_pages + b.failed_pages,
+    )
+
+
+def _fetch_org_language_page(
+    token: str, org: str, team: Optional[str], page_size: int, cursor: Optional[str],
+) -> _LanguageBytes:
+    """Map step: one page of repositories reduced to its partial byte totals."""
+    try:
+        data = _graphql(token, _ORG_PAGE_QUERY, _org_variables(org, team, page_size, cursor))
+    except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
+        return _LanguageBytes({}, {}, 0, 1)
+    byte_totals: dict[str, int] = {}
+    api_colors: dict[str, str] = {}
+    nodes = _org_repositories(data, team).get("nodes") or []
+    counted = _add_repo_languages(nodes, byte_totals, api_colors)
+    return _LanguageBytes(byte_totals, api_colors, counted)
+
+
+class _OrgCursors:
+    """Walks the repositories connection with a pageInfo-only query, yielding each page's start cursor."""
+
+    def __init__(self, token: str, org: str, team: Optional[str], page_size: int, max_pages: int) -> None:
+        self.token, self.org, self.team = token, org, team
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.complete = False
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        cursor: Optional[str] = None
+        for _ in range(self.max_pages):
+            yield cursor
+            try:
+                data = _graphql(
+                    self.token, _ORG_CURSOR_QUERY,
+                    _org_variables(self.org, self.team, self.page_size, cursor),
+                )
+            except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
+                return
+            info = _org_repositories(data, self.team).get("pageInfo") or {}
+            if not info.get("hasNextPage") or not info.get("endCursor"):
+                self.complete = True
+                return
+            cursor = info["endCursor"]
+
+
+_DONE = object()
+
+
+def _tree_reduce(
+    pool: ThreadPoolExecutor,
+    tasks: Iterable[Any],
+    map_fn: Callable[[Any], Any],
+    merge_fn: Callable[[Any, Any], Any],
+    empty: Any,
+    max_in_flight: int,
+) -> Any:
+    """Map each task on the pool and merge results pairwise, level by level, as they complete.
+
+    Like a binary counter: a result at level L waits for one sibling at L and
+    the pair is merged on the pool into level L + 1. Only max_in_flight map or
+    merge jobs and at most one waiting partial per level are alive at a time.
+    """
+    waiting: dict[int, Any] = {}
+    in_flight: dict[Future, int] = {}
+    task_iter = iter(tasks)
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < max_in_flight:
+            task = next(task_iter, _DONE)
+            if task is _DONE:
+                exhausted = True
+            else:
+                in_flight[pool.submit(map_fn, task)] = 0
+        if not in_flight:
+            break
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            level = in_flight.pop(future)
+            result = future.result()
+            if level in waiting:
+                in_flight[pool.submit(merge_fn, waiting.pop(level), result)] = level + 1
+            else:
+                waiting[level] = result
+    result = empty
+    for level in sorted(waiting):
+        result = merge_fn(result, waiting[level])
+    return result
+
+
+def _fetch_org_languages(
+    token: str,
+    org: str,
+    team: Optional[str] = None,
+    page_size: int = _ORG_PAGE_SIZE,
+    max_pages: int = _ORG_MAX_PAGES,
+    max_workers: int = _ORG_WORKERS,
+) -> OrgLanguages:
+    """Language distribution across an organization's (or one team's) non-fork repositories.
+
+    A pageInfo-only walk discovers page cursors; workers fetch each page's
+    languages and reduce it to partial byte totals, which are tree-merged as
+    they arrive. Percentages and the "Other" bucket are applied once at the
+    end. Memory is bounded by page size times in-flight pages, not org size.
+    """
+    cursors = _OrgCursors(token, org, team, page_size, max_pages)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        merged = _tree_reduce(
+            pool,
+            cursors,
+            lambda cursor: _fetch_org_language_page(token, org, team, page_size, cursor),
+            _merge_language_bytes,
+            _LanguageBytes({}, {}),
+            max_in_flight=2 * max(1, max_workers),
+        )
+    return OrgLanguages(
+        languages=_language_entries(merged.byte_totals, merged.api_colors),
+        repositories=merged.repositories,
+        complete=cursors.complete and merged.failed_pages == 0,
+    )
+
+
+# Independently refreshable parts of a user's data (see GitHubDataFetcher.refresh).
+SECTIONS = ("calendar", "total", "languages", "activity")
+
+
 class GitHubDataFetcher(DataFetcher):
-    """Fetches profile stats from GitHub API and merges optional config overrides."""
+    """Fetches profile stats from GitHub API and merges optional config overrides.
+
+    If state_dir is given, the all-time contribution backfill is checkpointed
+    there per user and resumed on the next run. max_commit_pages caps the
+    commit-history pages read per user for hour/repository activity (0 disables it).
+
+    If ranking is given, every user whose calendar and all-time backfill were
+    fetched completely is added to the fleet sketches (once per monthly epoch)
+    and universal rank / power level become fleet percentiles once the fleet has
+    MIN_FLEET_SIZE users; the caller owns loading and saving the ranking.
+
+    Section results are cached per user, so refresh() can re-fetch only the
+    sections that are stale (calendar: past-year total and weeks; total: the
+    all-time backfill with wrapped periods and heatmap days; languages;
+    activity) and rebuild the data from the rest. Callers that do not refresh
+    a user again should forget() them so the cache does not grow with the batch.
+    """
+
+    def __init__(
+        self,
+        state_dir: Optional[Path] = None,
+        max_commit_pages: int = _DEFAULT_MAX_COMMIT_PAGES,
+        ranking: Optional[FleetRanking] = None,
+    ) -> None:
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.max_commit_pages = max_commit_pages
+        self.ranking = ranking
+        self._sections: dict[str, dict[str, Any]] = {}
 
     def fetch(
         self,
         username: str,
         config_path: Optional[Path] = None,
     ) -> ProfileStatsData:
+        return self.refresh(username, SECTIONS, config_path)
+
+    def fetch_organization(
+        self,
+        org: str,
+        team: Optional[str] = None,
+        max_pages: int = _ORG_MAX_PAGES,
+    ) -> ProfileStatsData:
+        """Language distribution across an org's (or a team's) repositories, shaped for render_stats.
+
+        Only languages and the repository count are filled in; languages_complete
+        is False when some repository pages could not be read.
+        """
+        token = _get_token()
+        result = (
+            _fetch_org_languages(token, org, team, max_pages=max_pages)
+            if token and org
+            else OrgLanguages([], 0, False)
+        )
+        top_lang = result.languages[0].name if result.languages else "N/A"
+        return ProfileStatsData(
+            contribution=ContributionStats(past_year=0, total=0),
+            languages=result.languages,
+            wrapped=WrappedMetrics("—", 0, "—", "—", top_lang, "—"),
+            languages_complete=result.complete,
+            repositories=result.repositories,
+        )
+
+    def forget(self, username: str) -> None:
+        """Drop the user's cached sections (batch runs call this once a user is written out)."""
+        self._sections.pop(username.lower(), None)
+
+    def recent_contributions(self, username: str, days: int = 7) -> int:
+        """Contributions in the last `days` days of the cached past-year calendar (0 if unknown)."""
+        past = self._sections.get(username.lower(), {}).get("calendar")
+        if past is None:
+            return 0
+        counts = [c for _, c in iter_calendar_days(past.weeks)]
+        return sum(counts[-days:])
+
+    def refresh(
+        self,
+        username: str,
+        sections: Iterable[str],
+        config_path: Optional[Path] = None,
+    ) -> ProfileStatsData:
+        """Re-fetch the given sections (any missing from the cache are fetched too) and rebuild the data.
+
+        A section whose fetch fails (or, for the total, comes back partial) keeps
+        its previously cached value and is listed in the result's
+        failed_sections, so the scheduler retries it instead of marking it fresh.
+        """
         overrides = _load_config(Path(config_path)) if config_path else ConfigOverrides()
+        metrics = enabled_metrics(overrides.metrics)
         token = _get_token()
+        cache = self._sections.setdefault(username.lower(), {})
+        failed: list[str] = []
+        if token and username:
+            wanted = set(sections)
+            if "calendar" in wanted or "calendar" not in cache:
+                past = _fetch_past_year(token, username)
+                if past is not None or "calendar" not in cache:
+                    cache["calendar"] = past
+                if past is None:
+                    failed.append("calendar")
+            if "total" in wanted or "total" not in cache:
+                old = cache.get("total")
+                if cache["calendar"] is None:
+                    failed.append("total")
+                else:
+                    backfill = _backfill_contributions(
+                        token, username, cache["calendar"], self.state_dir, metrics,
+                    )
+                    # A partial backfill never replaces a complete one.
+                    if backfill.total_complete or old is None or not old.total_complete:
+                        cache["total"] = backfill
+                    if not backfill.total_complete:
+                        failed.append("total")
+            if "languages" in wanted or "languages" not in cache:
+                entries = _fetch_languages(token, username)
+                if entries is not None or "languages" not in cache:
+                    cache["languages"] = entries
+                if entries is None:
+                    failed.append("languages")
+            if "activity" in wanted or "activity" not in cache:
+                try:
+                    cache["activity"] = _fetch_commit_activity(token, username, self.max_commit_pages)
+                except (urllib.error.HTTPError, urllib.error.URLError, json.JSONDecodeError):
+                    cache.setdefault("activity", None)
+                    failed.append("activity")
         past_year, total = 0, 0
-        languages: list[LanguageEntry] = []
+        total_complete = False
         calendar_weeks: list[Any] = []
-        if token and username:
-            past_year, total, calendar_weeks = _fetch_contributions(token, username)
-            languages = _fetch_languages(token, username)
+        periods: dict[str, WrappedPeriod] = {}
+        calendar: Optional[ContributionCalendar] = None
+        if cache.get("total") is not None:
+            past_year, total, calendar_weeks, total_complete, periods, calendar = cache["total"]
+        if cache.get("calendar") is not None:
+            # The calendar section may be fresher than the last backfill.
+            past_year, calendar_weeks = cache["calendar"].past_year, cache["calendar"].weeks
+        languages: list[LanguageEntry] = cache.get("languages") or []
+        activity: Optional[ActivityStats] = cache.get("activity")
+        # The fleet sketch records what was fetched, never config overrides.
+        fetched_past_year, fetched_total = past_year, total
         if overrides.past_year_contributions is not None:
             past_year = overrides.past_year_contributions
         if overrides.total_contributions is not None:
             total = overrides.total_contributions
-        contribution = ContributionStats(past_year=past_year, total=total)
+            total_complete = True
+        contribution = ContributionStats(
+            past_year=past_year, total=total, total_complete=total_complete,
+        )
         top_lang = (languages[0].name if languages else "N/A")
 
-        computed_streak, computed_month, computed_day = _compute_wrapped_from_calendar(calendar_weeks)
+        if "all_time" in periods:
+            computed = dict(periods["all_time"].metrics)
+        else:
+            computed = _compute_wrapped_from_calendar(calendar_weeks, metrics)
+        values = {**computed, **overrides.metric_overrides}
+        computed_streak = values.get("longest_streak_days", 0)
+        computed_month = values.get("most_active_month", "—")
+        computed_day = values.get("most_active_day", "—")
         longest_streak = (
             overrides.longest_streak_days
             if overrides.longest_streak_days is not None
             else computed_streak
         )
+        extra = [
+            (m.label, str(values[m.name]) if m.name in overrides.metric_overrides else m.display(values[m.name]))
+            for m in metrics
+            if not m.core and m.name in values
+        ]
+        if activity is not None:
+            extra.append(("Most Active Hour", activity.most_active_hour))
+            if activity.top_repositories:
+                extra.append(("Top Repository", activity.top_repositories[0][0].split("/", 1)[-1]))
+        rank = _compute_rank(past_year)
+        power_level = _compute_power_level(total, longest_streak, len(languages))
+        if self.ranking is not None and token and username:
+            backfill = cache.get("total")
+            # Failed or partial fetches would add bogus zeros to everyone's percentiles.
+            if (
+                cache.get("calendar") is not None
+                and backfill is not None and backfill.total_complete
+                and cache.get("languages") is not None
+            ):
+                fetched_score = _power_score(
+                    fetched_total, computed.get("longest_streak_days", 0), len(languages),
+                )
+                _record_fleet_user(self.ranking, username, fetched_past_year, fetched_score)
+            if self.ranking.size >= MIN_FLEET_SIZE:
+                score = _power_score(total, longest_streak, len(languages))
+                rank, power_level = _fleet_rank_and_power(self.ranking, past_year, score)
         wrapped = WrappedMetrics(
-            universal_rank=overrides.universal_rank or _compute_rank(past_year),
+            universal_rank=overrides.universal_rank or rank,
             longest_streak_days=longest_streak,
             most_active_month=overrides.most_active_month or computed_month,
             most_active_day=overrides.most_active_day or computed_day,
             top_language=overrides.top_language or top_lang,
-            power_level=overrides.power_level or _compute_power_level(
-                total, longest_streak, len(languages),
-            ),
+            power_level=overrides.power_level or power_level,
+            extra=extra,
         )
         return ProfileStatsData(
             contribution=contribution,
             languages=languages,
             wrapped=wrapped,
+            periods=periods,
+            activity=activity,
+            calendar=calendar,
+            languages_complete=not token or cache.get("languages") is not None,
+            failed_sections=failed,
         )
@@ -0,0 +1,217 @@
+"""Per-user daily stats history in fixed-width columnar files.
+
+Each user gets a directory with one file per column. Every row is one day,
+and every column has a fixed width per row. Appending a run writes one record
+per column, which is O(1); re-running on the same day overwrites that day's
+row in place. String fields (month, rank, language names, ...) are stored as
+ids into an append-only strings.txt dictionary.
+
+Readers mmap the column files and hand out memoryview slices. A date-range
+scan binary-searches the sorted day column and slices the rest, so nothing
+outside the range is read or parsed. Files use native byte order; they are a
+local cache, not an interchange format.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from .types import ProfileStatsData
+
+LANGUAGE_SLOTS = 10
+
+# (column, array typecode, values per row)
+COLUMNS: list[tuple[str, str, int]] = [
+    ("day", "i", 1),  # date.toordinal(); sorted ascending
+    ("past_year", "q", 1),
+    ("total", "q", 1),
+    ("longest_streak_days", "i", 1),
+    ("most_active_month", "H", 1),
+    ("most_active_day", "H", 1),
+    ("top_language", "H", 1),
+    ("universal_rank", "H", 1),
+    ("power_level", "H", 1),
+    ("language_ids", "H", LANGUAGE_SLOTS),
+    ("language_percents", "f", LANGUAGE_SLOTS),
+]
+_STRINGS_FILE = "strings.txt"
+
+
+def _user_dir(root: Path, username: str) -> Path:
+    return Path(root) / username.lower()
+
+
+def _row_width(code: str, per_row: int) -> int:
+    return array(code).itemsize * per_row
+
+
+def _load_strings(path: Path) -> list[str]:
+    try:
+        return path.read_text(encoding="utf-8").split("\n")[:-1]
+    except OSError:
+        return []
+
+
+class _StringIds:
+    """Append-only string dictionary; id 0 is the empty string."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.values = _load_strings(path) or [""]
+        self.ids = {v: i for i, v in enumerate(self.values)}
+        self._new: list[str] = []
+
+    def id(self, value: str) -> int:
+        value = (value or "").replace("\n", " ")
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+            self._new.append(value)
+        return self.ids[value]
+
+    def flush(self) -> None:
+        if not self._new and self.path.exists():
+            return
+        pending = self.values if not self.path.exists() else self._new
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(v + "\n" for v in pending))
+        self._new = []
+
+
+def _row_values(data: ProfileStatsData, strings: _StringIds, day: date) -> dict[str, list]:
+    w = data.wrapped
+    langs = data.languages[:LANGUAGE_SLOTS]
+    pad = LANGUAGE_SLOTS - len(langs)
+    return {
+        "day": [day.toordinal()],
+        "past_year": [data.contribution.past_year],
+        "total": [data.contribution.total],
+        "longest_streak_days": [w.longest_streak_days],
+        "most_active_month": [strings.id(w.most_active_month)],
+        "most_active_day": [strings.id(w.most_active_day)],
+        "top_language": [strings.id(w.top_language)],
+        "universal_rank": [strings.id(w.universal_rank)],
+        "power_level": [strings.id(w.power_level)],
+        "language_ids": [strings.id(e.name) for e in langs] + [0] * pad,
+        "language_percents": [e.percent for e in langs] + [0.0] * pad,
+    }
+
+
+def append_history(root: Path, username: str, data: ProfileStatsData, day: Optional[date] = None) -> None:
+    """Append today's stats as one row (or overwrite the row if today is already stored).
+
+    Touches only the tail of each column file. Columns left uneven by an
+    interrupted append are first trimmed back to the last complete row.
+    """
+    day = day or date.today()
+    folder = _user_dir(root, username)
+    folder.mkdir(parents=True, exist_ok=True)
+    strings = _StringIds(folder / _STRINGS_FILE)
+    paths = {name: folder / f"{name}.col" for name, _, _ in COLUMNS}
+    widths = {name: _row_width(code, n) for name, code, n in COLUMNS}
+    rows = min(
+        (paths[name].stat().st_size if paths[name].exists() else 0) // widths[name]
+        for name, _, _ in COLUMNS
+    )
+    position = rows
+    if rows:
+        with open(paths["day"], "rb") as f:
+            f.seek((rows - 1) * widths["day"])
+            last = array("i", f.read(widths["day"]))[0]
+        if last == day.toordinal():
+            position = rows - 1
+        elif last > day.toordinal():
+            raise ValueError(f"history for {username} already has a later day than {day}")
+    values = _row_values(data, strings, day)
+    strings.flush()
+    for name, code, _ in COLUMNS:
+        mode = "r+b" if paths[name].exists() else "w+b"
+        with open(paths[name], mode) as f:
+            f.truncate(rows * widths[name])
+            f.seek(position * widths[name])
+            f.write(array(code, values[name]).tobytes())
+
+
+class HistoryReader:
+    """Zero-copy reader over one user's history columns.
+
+    Use as a context manager; release any memoryviews returned by scan()
+    before the reader is closed.
+    """
+
+    def __init__(self, root: Path, username: str) -> None:
+        folder = _user_dir(root, username)
+        self.strings = _load_strings(folder / _STRINGS_FILE) or [""]
+        self._maps: list[mmap.mmap] = []
+        self._views: dict[str, memoryview] = {}
+        sizes: dict[str, int] = {}
+        for name, code, per_row in COLUMNS:
+            path = folder / f"{name}.col"
+            size = path.stat().st_size if path.exists() else 0
+            sizes[name] = size // _row_width(code, per_row)
+            if size == 0:
+                self._views[name] = memoryview(array(code))
+                continue
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            width = _row_width(code, per_row)
+            self._views[name] = memoryview(mm)[: (size // width) * width].cast(code)
+        self.rows = min(sizes.values()) if sizes else 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> "HistoryReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        for mm in self._maps:
+            mm.close()
+        self._maps = []
+
+    def _bounds(self, start: Optional[date], end: Optional[date]) -> tuple[int, int]:
+        days = self._views["day"][: self.rows]
+        lo = bisect_left(days, start.toordinal()) if start else 0
+        hi = bisect_right(days, end.toordinal()) if end else self.rows
+        return lo, hi
+
+    def scan(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        columns: Optional[list[str]] = None,
+    ) -> dict[str, memoryview]:
+        """Memoryview slices of the requested columns for rows with start <= day <= end.
+
+        Multi-value columns (language_ids / language_percents) are flat, with
+        LANGUAGE_SLOTS entries per row.
+        """
+        lo, hi = self._bounds(start, end)
+        wanted = columns or [name for name, _, _ in COLUMNS]
+        per_row = {name: n for name, _, n in COLUMNS}
+        return {name: self._views[name][lo * per_row[name]: hi * per_row[name]] for name in wanted}
+
+    def string(self, string_id: int) -> str:
+        return self.strings[string_id] if 0 <= string_id < len(self.strings) else ""
+
+
+def read_totals(root: Path, username: str, start: Optional[date] = None) -> list[int]:
+    """Total contributions per stored day from start onward (copied out, reader closed)."""
+    with HistoryReader(root, username) as reader:
+        view = reader.scan(start=start, columns=["total"])["total"]
+        try:
+            return view.tolist()
+        finally:
+            view.release()
@@ -0,0 +1,319 @@
+"""Fleet-calibrated ranking: mergeable KLL quantile sketches over processed users.
+
+Each processed user adds their past-year contributions and power score to a
+pair of sketches. Ranks are then true percentiles of the population we have
+seen rather than fixed thresholds. Sketches use bounded memory (O(k log(n/k))
+items), amortized O(log n) updates, merge losslessly in the KLL sense across
+parallel workers, and persist as JSON between runs. Users already counted are
+remembered in a fixed-size Bloom filter, not a set of keys.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+
+# Default accuracy parameter: rank error is roughly 1.7/k (~1% at k=200).
+_DEFAULT_K = 200
+# Below this many users the fleet says little; callers fall back to fixed tiers.
+MIN_FLEET_SIZE = 100
+# Users per epoch the dedup filter is sized for (~117 KiB at a 1% false-positive rate).
+DEFAULT_EXPECTED_USERS = 100_000
+_FALSE_POSITIVE_RATE = 0.01
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives.
+
+    Sized for `capacity` keys at `error_rate`; memory does not grow with the
+    keys added. Past capacity the false-positive rate climbs, so a growing
+    share of genuinely new keys read as already present.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_EXPECTED_USERS, error_rate: float = _FALSE_POSITIVE_RATE) -> None:
+        capacity = max(1, capacity)
+        self.bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str) -> bool:
+        """Add key; False if it (probably) was present already."""
+        added = False
+        for p in self._positions(key):
+            mask = 1 << (p & 7)
+            if not self._array[p >> 3] & mask:
+                self._array[p >> 3] |= mask
+                added = True
+        return added
+
+    def union(self, other: "BloomFilter") -> None:
+        if (other.bits, other.hashes) != (self.bits, self.hashes):
+            raise ValueError("cannot merge Bloom filters of different sizes")
+        self._array = bytearray(a | b for a, b in zip(self._array, other._array))
+
+    def to_dict(self) -> dict[str, Any]:
+        packed = base64.b64encode(zlib.compress(bytes(self._array))).decode("ascii")
+        return {"bits": self.bits, "hashes": self.hashes, "data": packed}
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "BloomFilter":
+        bloom = cls()
+        bloom.bits = int(raw["bits"])
+        bloom.hashes = int(raw["hashes"])
+        bloom._array = bytearray(zlib.decompress(base64.b64decode(raw["data"])))
+        if len(bloom._array) != (bloom.bits + 7) // 8:
+            raise ValueError("Bloom filter data does not match its size")
+        return bloom
+
+
+class KllSketch:
+    """KLL streaming quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Level h holds items of weight 2**h. When the sketch exceeds its capacity,
+    the lowest full level is sorted and every other item (random offset) is
+    promoted to the next level, halving its size while keeping rank error bounded.
+    """
+
+    def __init__(self, k: int = _DEFAULT_K, seed: Optional[int] = None) -> None:
+        self.k = k
+        self.n = 0
+        self.compactors: list[list[float]] = [[]]
+        self._rng = random.Random(seed)
+        self._size = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def update(self, value: float) -> None:
+        self.compactors[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size():
+            self._compress()
+
+    def _compress(self) -> None:
+        for h in range(len(self.compactors)):
+            level = self.compactors[h]
+            if len(level) >= self._capacity(h):
+                if h + 1 == len(self.compactors):
+                    self.compactors.append([])
+                level.sort()
+                # An odd item stays behind so total weight is preserved exactly.
+                keep = [level.pop()] if len(level) % 2 else []
+                offset = self._rng.randint(0, 1)
+                promoted = level[offset::2]
+                self.compactors[h + 1].extend(promoted)
+                self.compactors[h] = keep
+                self._size = sum(len(c) for c in self.compactors)
+                if self._size < self._max_size():
+                    return
+
+    def merge(self, other: "KllSketch") -> None:
+        """Fold other into this sketch; the result summarizes both streams."""
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for h, level in enumerate(other.compactors):
+            self.compactors[h].extend(level)
+        self.n += other.n
+        self._size = sum(len(c) for c in self.compactors)
+        while self._size >= self._max_size():
+            before = self._size
+            self._compress()
+            if self._size >= before:
+                break
+
+    def rank(self, value: float) -> float:
+        """Estimated fraction of the stream strictly below value, in [0, 1]."""
+        if self.n == 0:
+            return 0.0
+        below = sum(
+            (1 << h) * sum(1 for x in level if x < value)
+            for h, level in enumerate(self.compactors)
+        )
+        return min(1.0, below / self.n)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at fraction q of the stream (None when empty)."""
+        items = sorted(
+            (x, 1 << h) for h, level in enumerate(self.compactors) for x in level
+        )
+        if not items:
+            return None
+        target = q * sum(w for _, w in items)
+        seen = 0
+        for x, w in items:
+            seen += w
+            if seen >= target:
+                return x
+        return items[-1][0]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"k": self.k, "n": self.n, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "KllSketch":
+        sketch = cls(k=int(raw.get("k") or _DEFAULT_K))
+        sketch.n = int(raw.get("n") or 0)
+        sketch.compactors = [list(level) for level in raw.get("compactors") or [[]]] or [[]]
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
+
+
+def _top_percent(sketch: KllSketch, value: float) -> int:
+    """Share of the fleet at or above value, as a whole percent in [1, 100]."""
+    return max(1, min(100, int(math.ceil(100 * (1.0 - sketch.rank(value))))))
+
+
+class FleetRanking:
+    """Per-metric sketches of processed users, persisted as one JSON file.
+
+    Metrics are "contributions" (past-year contributions) and "power" (power
+    score). Samples are keyed by user and grouped into epochs (e.g. calendar
+    months): within an epoch each user counts once, however many runs see
+    them. Keys live in a Bloom filter sized for expected_users, so a rare
+    false positive skips a new user rather than memory growing with the
+    fleet. When a new epoch starts, the finished epoch's sketches are kept as
+    `previous` and answer queries until the new epoch has MIN_FLEET_SIZE
+    users, so stale values age out after one epoch instead of piling up.
+
+    Parallel workers must not save their whole ranking for merging: each
+    loaded the same base, so merging them would add the base once per worker.
+    Instead a worker sets `delta` (e.g. a fresh FleetRanking), which receives
+    only the users it adds, and saves that; the coordinator merges each delta
+    into the base exactly once.
+    """
+
+    METRICS = ("contributions", "power")
+
+    def __init__(self, k: int = _DEFAULT_K, epoch: str = "", expected_users: int = DEFAULT_EXPECTED_USERS) -> None:
+        self.k = k
+        self.epoch = epoch
+        self.expected_users = expected_users
+        self.users = BloomFilter(expected_users)
+        self.sketches: dict[str, KllSketch] = {m: KllSketch(k) for m in self.METRICS}
+        self.previous: Optional[dict[str, KllSketch]] = None
+        # Receives the users added here (not merged in), for merging elsewhere.
+        self.delta: Optional[FleetRanking] = None
+
+    def _active(self) -> dict[str, KllSketch]:
+        if self.previous is not None and self.sketches["contributions"].n < MIN_FLEET_SIZE:
+            return self.previous
+        return self.sketches
+
+    @property
+    def size(self) -> int:
+        """Users behind the sketches that currently answer queries."""
+        return self._active()["contributions"].n
+
+    def start_epoch(self, epoch: str) -> None:
+        """Roll over to epoch if it is newer; the finished epoch becomes `previous`."""
+        if epoch <= self.epoch:
+            return
+        if self.sketches["contributions"].n:
+            self.previous = self.sketches
+        self.sketches = {m: KllSketch(self.k) for m in self.METRICS}
+        self.users = BloomFilter(self.expected_users)
+        self.epoch = epoch
+
+    def add_user(self, past_year_contributions: int, power_score: float, user: Optional[str] = None) -> bool:
+        """Add one user's values; with a user key, repeats within the epoch are ignored."""
+        if user is not None and not self.users.add(user.lower()):
+            return False
+        self.sketches["contributions"].update(past_year_contributions)
+        self.sketches["power"].update(power_score)
+        if self.delta is not None:
+            self.delta.start_epoch(self.epoch)
+            self.delta.add_user(past_year_contributions, power_score, user)
+        return True
+
+    def top_percent(self, metric: str, value: float) -> int:
+        return _top_percent(self._active()[metric], value)
+
+    def percentile(self, metric: str, value: float) -> float:
+        """Percent of the fleet strictly below value."""
+        return 100.0 * self._active()[metric].rank(value)
+
+    def merge(self, other: "FleetRanking") -> None:
+        """Fold in another ranking whose users are disjoint from this one's.
+
+        Every sample in other is added, so merge each worker's delta once and
+        never a ranking that shares a base with this one. Both sides are
+        aligned to the newer epoch first; a sketch from an older epoch only
+        contributes to `previous`.
+        """
+        if other.epoch > self.epoch:
+            self.start_epoch(other.epoch)
+        if other.epoch == self.epoch:
+            for metric in self.METRICS:
+                self.sketches[metric].merge(other.sketches[metric])
+            self.users.union(other.users)
+            older = other.previous
+        else:
+            older = other.sketches if other.sketches["contributions"].n else other.previous
+        if older is not None:
+            if self.previous is None:
+                self.previous = {m: KllSketch(self.k) for m in self.METRICS}
+            for metric in self.METRICS:
+                self.previous[metric].merge(older[metric])
+
+    @classmethod
+    def load(cls, path: Path) -> "FleetRanking":
+        """Load from path; a missing or unreadable file gives an empty ranking."""
+        ranking = cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return ranking
+        if not isinstance(raw, dict):
+            return ranking
+        for metric in cls.METRICS:
+            if isinstance(raw.get(metric), dict):
+                ranking.sketches[metric] = KllSketch.from_dict(raw[metric])
+        previous = raw.get("previous")
+        if isinstance(previous, dict) and all(isinstance(previous.get(m), dict) for m in cls.METRICS):
+            ranking.previous = {m: KllSketch.from_dict(previous[m]) for m in cls.METRICS}
+        ranking.epoch = str(raw.get("epoch") or "")
+        users = raw.get("users")
+        if isinstance(users, dict):
+            try:
+                ranking.users = BloomFilter.from_dict(users)
+            except (KeyError, TypeError, ValueError, zlib.error):
+                pass
+        elif isinstance(users, list):  # files written before the Bloom filter
+            for user in users:
+                ranking.users.add(str(user))
+        return ranking
+
+    def save(self, path: Path) -> None:
+        """Atomically write the sketches to path (write temp file, then rename)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        raw: dict[str, Any] = {m: s.to_dict() for m, s in self.sketches.items()}
+        raw["epoch"] = self.epoch
+        raw["users"] = self.users.to_dict()
+        if self.previous is not None:
+            raw["previous"] = {m: s.to_dict() for m, s in self.previous.items()}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(raw, f, separators=(",", ":"))
+        os.replace(tmp, path)
@@ -2,7 +2,10 @@
 from __future__ import annotations
 
 import math
+from bisect import bisect_left
+from datetime import date, timedelta
 from pathlib import Path
+from typing import Sequence
 from xml.sax.saxutils import escape
 
 from .contracts import SvgRenderer
@@ -43,6 +46,45 @@ def _donut_segment_paths(
     return paths
 
 
+# GitHub dark-theme heatmap palette, level 0 (no contributions) .. level 4.
+HEATMAP_COLORS = ["#161b22", "#0e4429", "#006d32", "#26a641", "#39d353"]
+_HEATMAP_PITCH = 12  # cell size 10 + gap 2
+_HEATMAP_WEEKS_PER_BAND = 53
+_HEATMAP_BAND_HEIGHT = 9 * _HEATMAP_PITCH  # 7 day rows + room for the next band's label; keeps the grid pattern aligned
+
+
+def _heatmap_thresholds(counts: Sequence[int]) -> list[int]:
+    """Quartiles of the non-zero day counts; a count's level is 1 + how many it exceeds."""
+    nonzero = sorted(c for c in counts if c > 0)
+    if not nonzero:
+        return []
+    return [nonzero[max(0, len(nonzero) * q // 4 - 1)] for q in (1, 2, 3)]
+
+
+def _heatmap_window(data: ProfileStatsData, years: int) -> tuple[date, Sequence[int]]:
+    """Last `years` * 365 days of the calendar (or the past year of zeros without one)."""
+    span = max(1, years) * 365
+    cal = data.calendar
+    if cal is None or not cal.counts:
+        return date.today() - timedelta(days=span - 1), [0] * span
+    counts = cal.counts[-span:]
+    start = date.fromisoformat(cal.start) + timedelta(days=len(cal.counts) - len(counts))
+    return start, counts
+
+
+def _sparkline_points(values: Sequence[int], width: float, height: float) -> str:
+    """Polyline points for values scaled into width x height, at most one point per pixel."""
+    n = len(values)
+    buckets = max(2, min(n, int(width)))
+    sampled = [values[min(n - 1, (i * n) // buckets)] for i in range(buckets - 1)] + [values[-1]]
+    lo, hi = min(sampled), max(sampled)
+    span = (hi - lo) or 1
+    step = width / (len(sampled) - 1)
+    return " ".join(
+        f"{i * step:.1f},{height - (v - lo) * height / span:.1f}" for i, v in enumerate(sampled)
+    )
+
+
 class SvgRendererImpl(SvgRenderer):
     """Renders both profile stats and wrapped SVGs to disk."""
 
@@ -54,8 +96,17 @@ class SvgRendererImpl(SvgRenderer):
         day = _escape_svg_text(w.most_active_day)
         lang = _escape_svg_text(w.top_language)
         power = _escape_svg_text(w.power_level)
-        svg = f"""<svg width="449" height="280" viewBox="0 0 449 280" xmlns="http://www.w3.org/2000/svg" lang="en" xml:lang="en">
-<rect x="2" y="2" width="445" height="276" rx="6" stroke-width="4" stroke="rgba(56,139,253,0.4)" fill="#0d1117"/>
+        extra_rows: list[str] = []
+        for i, (label, value) in enumerate(w.extra):
+            y = 254 + i * 30
+            extra_rows.append(
+                f'<text x="22" y="{y}" fill="#8b949e" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="600">{_escape_svg_text(label)}</text>\n'
+                f'<text x="427" y="{y}" fill="#c9d1d9" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="700" text-anchor="end">{_escape_svg_text(value)}</text>\n'
+            )
+        extra_block = "".join(extra_rows)
+        height = 280 + 30 * len(w.extra)
+        svg = f"""<svg width="449" height="{height}" viewBox="0 0 449 {height}" xmlns="http://www.w3.org/2000/svg" lang="en" xml:lang="en">
+<rect x="2" y="2" width="445" height="{height - 4}" rx="6" stroke-width="4" stroke="rgba(56,139,253,0.4)" fill="#0d1117"/>
 <text x="22" y="42" fill="#58a6ff" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="20" font-weight="700">GitHub Wrapped Metrics</text>
 <text x="22" y="74" fill="#8b949e" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="600">Universal Rank</text>
 <text x="427" y="74" fill="#c9d1d9" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="700" text-anchor="end">{rank}</text>
@@ -69,14 +120,20 @@ class SvgRendererImpl(SvgRenderer):
 <text x="427" y="194" fill="#c9d1d9" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="700" text-anchor="end">{lang}</text>
 <text x="22" y="224" fill="#8b949e" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="600">Power Level</text>
 <text x="427" y="224" fill="#c9d1d9" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="14" font-weight="700" text-anchor="end">{power}</text>
-</svg>
+{extra_block}</svg>
 """
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         Path(output_path).write_text(svg, encoding="utf-8")
 
     def render_stats(self, data: ProfileStatsData, output_path: Path) -> None:
-        # past_year kept in data for future use; only Total shown in UI
-        total = data.contribution.total
+        # past_year kept in data for future use; only Total shown in UI.
+        # Org/team cards have no contributions and show the repository count instead.
+        if data.repositories is not None:
+            heading, heading_len, row, row_len = "Repositories", 1030, "Total Repositories", 1505
+            total = data.repositories
+        else:
+            heading, heading_len, row, row_len = "Contributions", 1115, "Total Contributions", 1589
+            total = data.contribution.total
         paths_with_colors = _donut_segment_paths(91.0, data.languages)
         donut_paths = "\n".join(
             f'<path fill-rule="evenodd" fill="{color}" d="{d}"/>'
@@ -95,6 +152,13 @@ class SvgRendererImpl(SvgRenderer):
                 f"</g>"
             )
         legend_block = "\n".join(legend_rows)
+        sparkline = ""
+        if len(data.total_history) >= 2:
+            points = _sparkline_points(data.total_history, 130, 12)
+            sparkline = (
+                f'<g transform="translate(198, 22)"><polyline fill="none" stroke="#58a6ff" '
+                f'stroke-width="1.5" stroke-linejoin="round" points="{points}"/></g>\n'
+            )
         legend_height = 21 + len(data.languages) * row_height
         total_height = max(398, 84 + 21 + legend_height + 20)
         svg = f"""<svg width="449" height="{total_height}" viewBox="0 0 449 {total_height}" xmlns="http://www.w3.org/2000/svg" lang="en" xml:lang="en">
@@ -102,16 +166,16 @@ class SvgRendererImpl(SvgRenderer):
 <g font-weight="600" font-size="110pt" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" text-rendering="geometricPrecision">
 <g transform="translate(0, 21)" fill="#c9d1d9">
 <g transform="translate(15, 0)"><g transform="scale(0.095)">
-<text x="0" y="132" textLength="1115" lengthAdjust="spacingAndGlyphs">Contributions</text>
+<text x="0" y="132" textLength="{heading_len}" lengthAdjust="spacingAndGlyphs">{heading}</text>
 <text x="3537" y="132" textLength="418" lengthAdjust="spacingAndGlyphs">Total</text>
 </g></g>
 <g transform="translate(15, 21)">
 <path fill="#1f6feb" fill-rule="evenodd" d="M2.5 1.75a.25.25 0 01.25-.25h10.5a.25.25 0 01.25.25v10.5a.25.25 0 01-.25.25H2.75a.25.25 0 01-.25-.25V1.75zM2.75 0A1.75 1.75 0 001 1.75v10.5c0 .966.784 1.75 1.75 1.75h10.5A1.75 1.75 0 0015 12.25V1.75A1.75 1.75 0 0013.25 0H2.75zm8.03 6.28a.75.75 0 00-1.06-1.06L6.75 8.19l-1.97-1.97a.75.75 0 00-1.06 1.06l2.5 2.5a.75.75 0 001.06 0l3.5-3.5z"/>
 <g transform="scale(0.095)">
-<text lengthAdjust="spacingAndGlyphs" textLength="1589" x="263" y="132">Total Contributions</text>
+<text lengthAdjust="spacingAndGlyphs" textLength="{row_len}" x="263" y="132">{row}</text>
 <text lengthAdjust="spacingAndGlyphs" textLength="422" x="3537" y="132">{total}</text>
 </g></g>
-</g>
+{sparkline}</g>
 <g transform="translate(0, 84)" fill="#c9d1d9">
 <g transform="translate(15, 0)"><g transform="scale(0.095)">
 <text x="0" y="132" textLength="1829" lengthAdjust="spacingAndGlyphs">Language Distribution</text>
@@ -126,6 +190,86 @@ class SvgRendererImpl(SvgRenderer):
 </g>
 </g>
 </svg>
+"""
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(output_path).write_text(svg, encoding="utf-8")
+
+    def render_heatmap(self, data: ProfileStatsData, output_path: Path, years: int = 1) -> None:
+        """GitHub-style heatmap, one 53-week band per row, cells bucketed into quartile levels.
+
+        Each cell shape is defined once and referenced with <use>; cells are
+        grouped per level so the fill is written once per level, and empty full
+        weeks are painted by a single pattern-filled rect per band.
+        """
+        start, counts = _heatmap_window(data, years)
+        thresholds = _heatmap_thresholds(counts)
+        peak = max(counts, default=0)
+        lead = (start.weekday() + 1) % 7  # Sunday-first rows, like GitHub
+        n_cols = (lead + len(counts) + 6) // 7
+        n_bands = (n_cols + _HEATMAP_WEEKS_PER_BAND - 1) // _HEATMAP_WEEKS_PER_BAND
+        # Only the first and last week can be partial; their empty cells are drawn individually.
+        full_cols = (1 if lead else 0, n_cols - 1 if (lead + len(counts)) % 7 == 0 else n_cols - 2)
+        levels: list[list[str]] = [[] for _ in HEATMAP_COLORS]
+        for i, count in enumerate(counts):
+            slot = lead + i
+            col, row = divmod(slot, 7)
+            band, col = divmod(col, _HEATMAP_WEEKS_PER_BAND)
+            # The busiest days always get the top shade, so uniform activity isn't drawn faintest.
+            level = (4 if count == peak else bisect_left(thresholds, count) + 1) if count > 0 else 0
+            if level or not full_cols[0] <= col + band * _HEATMAP_WEEKS_PER_BAND <= full_cols[1]:
+                x, y = col * _HEATMAP_PITCH, band * _HEATMAP_BAND_HEIGHT + row * _HEATMAP_PITCH
+                levels[level].append(f'<use href="#c" x="{x}" y="{y}"/>')
+        backgrounds: list[str] = []
+        labels: list[str] = []
+        for band in range(n_bands):
+            first = band * _HEATMAP_WEEKS_PER_BAND
+            last = min(n_cols, first + _HEATMAP_WEEKS_PER_BAND) - 1
+            full_first, full_last = max(first, full_cols[0]), min(last, full_cols[1])
+            y = band * _HEATMAP_BAND_HEIGHT
+            if full_last >= full_first:
+                backgrounds.append(
+                    f'<rect x="{(full_first - first) * _HEATMAP_PITCH}" y="{y}" '
+                    f'width="{(full_last - full_first + 1) * _HEATMAP_PITCH}" height="84" fill="url(#e)"/>'
+                )
+            band_start = max(start, start + timedelta(days=first * 7 - lead))
+            labels.append(f'<text x="0" y="{y + 46}">{band_start.year}</text>')
+        groups = "\n".join(
+            f'<g fill="{color}">{"".join(cells)}</g>'
+            for color, cells in zip(HEATMAP_COLORS, levels) if cells
+        )
+        legend = "".join(
+            f'<use href="#c" x="{i * _HEATMAP_PITCH}" y="0" fill="{color}"/>'
+            for i, color in enumerate(HEATMAP_COLORS)
+        )
+        total = sum(counts)
+        # A partial backfill can cover less than was asked for; label what is shown.
+        if years <= 1:
+            span_label = "in the past year"
+        elif len(counts) < years * 365:
+            span_label = f"since {start:%b %Y}"
+        else:
+            span_label = f"in the last {years} years"
+        grid_height = n_bands * _HEATMAP_BAND_HEIGHT - 2 * _HEATMAP_PITCH
+        width = 70 + _HEATMAP_WEEKS_PER_BAND * _HEATMAP_PITCH + 16
+        height = 64 + grid_height + 40
+        svg = f"""<svg width="{width}" height="{height}" viewBox="0 0 {width} {height}" xmlns="http://www.w3.org/2000/svg" lang="en" xml:lang="en">
+<defs><rect id="c" width="10" height="10" rx="2"/><pattern id="e" width="12" height="12" patternUnits="userSpaceOnUse"><use href="#c" fill="{HEATMAP_COLORS[0]}"/></pattern></defs>
+<rect x="2" y="2" width="{width - 4}" height="{height - 4}" rx="6" stroke-width="4" stroke="rgba(56,139,253,0.4)" fill="#0d1117"/>
+<text x="22" y="38" fill="#58a6ff" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="20" font-weight="700">Contribution Heatmap</text>
+<text x="{width - 20}" y="38" fill="#8b949e" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="12" text-anchor="end">{total} contributions {_escape_svg_text(span_label)}</text>
+<g fill="#8b949e" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="10" text-anchor="end" transform="translate(60, 60)">
+{"".join(labels)}
+</g>
+<g transform="translate(70, 60)">
+{"".join(backgrounds)}
+{groups}
+</g>
+<g fill="#8b949e" font-family="Verdana,Geneva,DejaVu Sans,sans-serif" font-size="10">
+<text x="{width - 112}" y="{height - 19}" text-anchor="end">Less</text>
+<g transform="translate({width - 106}, {height - 28})">{legend}</g>
+<text x="{width - 44}" y="{height - 19}">More</text>
+</g>
+</svg>
 """
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         Path(output_path).write_text(svg, encoding="utf-8")
@@ -0,0 +1,258 @@
+"""Long-running refresh scheduler with per-section staleness policies.
+
+Instead of re-fetching everything on a fixed cron, every (user, section) pair
+has its own refresh interval with jitter. Due pairs are served most-stale
+first, weighted up for users with recent activity, and all work stays inside
+a global GraphQL request budget per hour. Last refresh times persist to a
+JSON state file so a restarted daemon picks up where it left off.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from .fetcher import SECTIONS, GitHubDataFetcher, request_count
+from .types import ProfileStatsData
+
+
+@dataclass(frozen=True)
+class SectionPolicy:
+    """How often a section is refreshed, and its request cost before one is observed."""
+
+    interval: timedelta
+    jitter: float = 0.1  # +/- fraction of interval
+    cost: int = 1
+
+
+DEFAULT_POLICIES: dict[str, SectionPolicy] = {
+    "calendar": SectionPolicy(timedelta(hours=6), cost=1),
+    "total": SectionPolicy(timedelta(days=1), cost=3),
+    "languages": SectionPolicy(timedelta(days=7), cost=1),
+    "activity": SectionPolicy(timedelta(days=1), cost=10),
+}
+
+# Retry delay after a refresh raised or a section failed; never longer than the section interval.
+_RETRY_AFTER = timedelta(minutes=15)
+# Upper bound on a single sleep so the loop stays responsive.
+_MAX_SLEEP_SECONDS = 300.0
+
+
+def parse_duration(text: str) -> timedelta:
+    """Parse '90s', '30m', '6h' or '7d' into a timedelta."""
+    units = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+    text = text.strip().lower()
+    if len(text) < 2 or text[-1] not in units:
+        raise ValueError(f"invalid duration: {text!r} (use e.g. 30m, 6h, 7d)")
+    return timedelta(**{units[text[-1]]: float(text[:-1])})
+
+
+class RequestBudget:
+    """Sliding one-hour window of spent requests."""
+
+    def __init__(self, per_hour: int) -> None:
+        self.per_hour = per_hour
+        self._spent: deque[tuple[float, int]] = deque()
+        self._in_window = 0
+
+    def _expire(self, now: float) -> None:
+        while self._spent and self._spent[0][0] <= now - 3600:
+            self._in_window -= self._spent.popleft()[1]
+
+    def available(self, now: float) -> int:
+        self._expire(now)
+        return self.per_hour - self._in_window
+
+    def wait_time(self, cost: int, now: float) -> float:
+        """Seconds until cost fits in the window (0 if it fits now)."""
+        self._expire(now)
+        need = self._in_window + min(cost, self.per_hour) - self.per_hour
+        if need <= 0:
+            return 0.0
+        freed = 0
+        for stamp, spent in self._spent:
+            freed += spent
+            if freed >= need:
+                return max(0.0, stamp + 3600 - now)
+        return 3600.0
+
+    def spend(self, cost: int, now: float) -> None:
+        if cost > 0:
+            self._spent.append((now, cost))
+            self._in_window += cost
+
+
+class RefreshScheduler:
+    """Refreshes users' sections on their own intervals within an hourly request budget.
+
+    on_update(username, data) is called after every refresh with the rebuilt
+    ProfileStatsData (e.g. to render SVGs). clock and sleep are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        fetcher: GitHubDataFetcher,
+        usernames: list[str],
+        policies: Optional[dict[str, SectionPolicy]] = None,
+        requests_per_hour: int = 4000,
+        on_update: Optional[Callable[[str, ProfileStatsData], None]] = None,
+        state_path: Optional[Path] = None,
+        config_path: Optional[Path] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.fetcher = fetcher
+        self.usernames = list(dict.fromkeys(usernames))
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.budget = RequestBudget(requests_per_hour)
+        self.on_update = on_update
+        self.state_path = Path(state_path) if state_path else None
+        self.config_path = config_path
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.last_refresh: dict[str, dict[str, float]] = self._load_state()
+        self._costs: dict[tuple[str, str], float] = {}
+        self._queue: list[tuple[float, str, str]] = []
+        # Smallest due batch the budget turned away last time (0: nothing blocked).
+        self._blocked_cost = 0
+        now = self.clock()
+        for user in self.usernames:
+            for section in SECTIONS:
+                last = self.last_refresh.get(user, {}).get(section)
+                due = now if last is None else last + self.policies[section].interval.total_seconds()
+                heapq.heappush(self._queue, (due, user, section))
+
+    def _load_state(self) -> dict[str, dict[str, float]]:
+        if self.state_path is None:
+            return {}
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return raw if isinstance(raw, dict) else {}
+
+    def _save_state(self) -> None:
+        if self.state_path is None:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.last_refresh, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _score(self, user: str, section: str, now: float) -> float:
+        """Staleness in intervals, boosted by the user's recent contributions."""
+        last = self.last_refresh.get(user, {}).get(section)
+        if last is None:
+            return math.inf
+        staleness = (now - last) / self.policies[section].interval.total_seconds()
+        return staleness * (1 + math.log1p(self.fetcher.recent_contributions(user)))
+
+    def _cost(self, user: str, section: str) -> float:
+        return self._costs.get((user, section), self.policies[section].cost)
+
+    def _next_due(self, section: str, now: float) -> float:
+        policy = self.policies[section]
+        spread = 1 + self.rng.uniform(-policy.jitter, policy.jitter)
+        return now + policy.interval.total_seconds() * spread
+
+    def _retry(self, user: str, section: str, now: float) -> None:
+        retry = min(_RETRY_AFTER, self.policies[section].interval).total_seconds()
+        heapq.heappush(self._queue, (now + retry, user, section))
+
+    def run_once(self) -> bool:
+        """Refresh the most urgent due user whose batch (all of their due sections) fits the budget.
+
+        A user whose batch does not fit yet does not hold back smaller batches
+        behind it. Returns False when nothing is due or no due batch fits; the
+        caller should then sleep for seconds_until_next().
+        """
+        now = self.clock()
+        ready: list[tuple[float, str, str]] = []
+        while self._queue and self._queue[0][0] <= now:
+            ready.append(heapq.heappop(self._queue))
+        if not ready:
+            self._blocked_cost = 0
+            return False
+        batches: dict[str, list[tuple[float, str, str]]] = {}
+        for item in ready:
+            batches.setdefault(item[1], []).append(item)
+        urgency = {
+            user: max(self._score(user, s, now) for _, _, s in items) for user, items in batches.items()
+        }
+        user, batch, estimate = "", [], 0
+        blocked: list[int] = []
+        for candidate in sorted(batches, key=lambda u: -urgency[u]):
+            cost = math.ceil(sum(self._cost(candidate, s) for _, _, s in batches[candidate]))
+            if self.budget.wait_time(cost, now) == 0:
+                user, batch, estimate = candidate, batches[candidate], cost
+                break
+            blocked.append(cost)
+        for item in ready:
+            if item[1] != user:
+                heapq.heappush(self._queue, item)
+        if not batch:
+            self._blocked_cost = min(blocked)
+            return False
+        self._blocked_cost = 0
+
+        sections = [s for _, _, s in batch]
+        before = request_count()
+        try:
+            data = self.fetcher.refresh(user, sections, self.config_path)
+        except Exception as e:  # keep the daemon alive; retry this batch later
+            print(f"Error refreshing {user} {sections}: {e}", file=sys.stderr)
+            for section in sections:
+                self._retry(user, section, now)
+            return True
+        spent = request_count() - before
+        self.budget.spend(spent, now)
+        failed = set(getattr(data, "failed_sections", ()))
+        if failed:
+            print(f"Refresh of {user} {sorted(failed)} failed; keeping cached data", file=sys.stderr)
+        for section in sections:
+            # Attribute the batch's cost to its sections in proportion to their estimates.
+            share = self._cost(user, section) / max(estimate, 1)
+            self._costs[(user, section)] = spent * share
+            if section in failed:
+                self._retry(user, section, now)
+                continue
+            self.last_refresh.setdefault(user, {})[section] = now
+            heapq.heappush(self._queue, (self._next_due(section, now), user, section))
+        self._save_state()
+        if self.on_update is not None:
+            self.on_update(user, data)
+        return True
+
+    def seconds_until_next(self) -> float:
+        """How long the loop may sleep: until the next due item, or until the budget
+        frees enough for the smallest batch run_once() had to turn away."""
+        now = self.clock()
+        if not self._queue:
+            return _MAX_SLEEP_SECONDS
+        if self._blocked_cost:
+            wait = self.budget.wait_time(self._blocked_cost, now)
+        else:
+            wait = self._queue[0][0] - now
+        return min(max(wait, 1.0), _MAX_SLEEP_SECONDS)
+
+    def run(self, max_refreshes: Optional[int] = None) -> None:
+        """Run until interrupted (or after max_refreshes refreshes)."""
+        done = 0
+        while max_refreshes is None or done < max_refreshes:
+            if self.run_once():
+                done += 1
+            else:
+                self.sleep(self.seconds_until_next())
@@ -0,0 +1,114 @@
+"""Tests for the streaming JSON Lines / CSV exporter."""
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import lzma
+from pathlib import Path
+
+import pytest
+from profile_stats.exporter import CsvExporter, JsonLinesExporter, open_exporter
+from profile_stats.types import (
+    ActivityStats,
+    ContributionStats,
+    LanguageEntry,
+    ProfileStatsData,
+    WrappedMetrics,
+)
+
+
+def _data(total: int) -> ProfileStatsData:
+    return ProfileStatsData(
+        contribution=ContributionStats(past_year=total // 2, total=total),
+        languages=[LanguageEntry("Go", 60.0, "#00ADD8"), LanguageEntry("Python", 40.0, "#3572A5")],
+        wrapped=WrappedMetrics(
+            "Top 15%", 12, "October", "Thursday", "Go", "Pro Mode",
+            extra=[("Current Streak", "3 days")],
+        ),
+        activity=ActivityStats("14:00 UTC", [0] * 24, [("octo/cat", 9)]),
+    )
+
+
+def test_open_exporter_infers_format_and_compression(tmp_path: Path) -> None:
+    with open_exporter(tmp_path / "stats.csv.gz") as exporter:
+        assert isinstance(exporter, CsvExporter)
+    assert gzip.decompress((tmp_path / "stats.csv.gz").read_bytes()).startswith(b"username,")
+    with open_exporter(tmp_path / "stats.out") as exporter:
+        assert isinstance(exporter, JsonLinesExporter)
+    with pytest.raises(ValueError):
+        open_exporter(tmp_path / "x", fmt="parquet")
+
+
+def test_jsonl_one_record_per_user(tmp_path: Path) -> None:
+    path = tmp_path / "stats.jsonl.xz"
+    with open_exporter(path) as exporter:
+        for i in range(3):
+            exporter.write(f"user{i}", _data(100 + i))
+    lines = lzma.decompress(path.read_bytes()).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["username"] for r in records] == ["user0", "user1", "user2"]
+    assert records[2]["total_contributions"] == 102
+    assert records[0]["languages"][1] == {"name": "Python", "percent": 40.0}
+    assert records[0]["metrics"] == {"Current Streak": "3 days"}
+    assert records[0]["activity"]["top_repositories"] == [{"name": "octo/cat", "commits": 9}]
+
+
+def test_csv_rows_are_flat(tmp_path: Path) -> None:
+    path = tmp_path / "stats.csv"
+    with open_exporter(path) as exporter:
+        exporter.write("octocat", _data(200))
+    rows = list(csv.DictReader(io.StringIO(path.read_text(encoding="utf-8"))))
+    assert len(rows) == 1
+    assert rows[0]["total_contributions"] == "200"
+    assert rows[0]["languages"] == "Go:60.0;Python:40.0"
+    assert rows[0]["top_repository"] == "octo/cat"
+    assert json.loads(rows[0]["metrics"]) == {"Current Streak": "3 days"}
+    assert rows[0]["repositories"] == ""
+
+
+def test_csv_carries_org_repository_count(tmp_path: Path) -> None:
+    path = tmp_path / "org.csv"
+    data = _data(0)
+    data.repositories = 42
+    with open_exporter(path) as exporter:
+        exporter.write("acme", data)
+    rows = list(csv.DictReader(io.StringIO(path.read_text(encoding="utf-8"))))
+    assert rows[0]["repositories"] == "42"
+
+
+def test_flush_makes_records_readable_before_close(tmp_path: Path) -> None:
+    path = tmp_path / "stats.jsonl.gz"
+    exporter = open_exporter(path)
+    exporter.write("octocat", _data(1))
+    exporter.flush()
+    partial = gzip.GzipFile(fileobj=io.BytesIO(path.read_bytes()))
+    assert partial.readline().startswith(b'{"username":"octocat"')
+    exporter.close()
+    exporter.close()
+
+
+def test_batch_export_does_not_keep_users_cached(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    import generate_github_profile_stats as cli
+    from profile_stats import fetcher as fetcher_mod
+
+    fetchers: list[fetcher_mod.GitHubDataFetcher] = []
+
+    class RecordingFetcher(fetcher_mod.GitHubDataFetcher):
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            fetchers.append(self)
+
+    def fake_graphql(token, query, variables=None):
+        raise fetcher_mod.urllib.error.URLError("offline")
+
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake_graphql)
+    monkeypatch.setattr(cli, "GitHubDataFetcher", RecordingFetcher)
+    users = [f"user{i}" for i in range(50)]
+    out = tmp_path / "stats.jsonl"
+    status = cli.main(["--state-dir", str(tmp_path / "state"), "--no-svg", "--export", str(out), *users])
+    assert status == 0
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 50
+    assert fetchers[0]._sections == {}
@@ -5,6 +5,7 @@ import tempfile
 from pathlib import Path
 
 import pytest
+from profile_stats import fetcher as fetcher_mod
 from profile_stats.fetcher import GitHubDataFetcher
 from profile_stats.types import ProfileStatsData
 
@@ -32,3 +33,347 @@ def test_fetcher_merges_config_overrides() -> None:
         assert data.wrapped.power_level == "Pro Mode"
     finally:
         config_path.unlink()
+
+
+def test_metric_toggles_accept_only_booleans(tmp_path: Path) -> None:
+    pytest.importorskip("yaml")
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        'metrics:\n  weekend_ratio: "false"\n  busiest_week: true\n  current_streak_days: no\n',
+        encoding="utf-8",
+    )
+    overrides = fetcher_mod._load_config(config_path)
+    assert overrides.metrics == {"busiest_week": True, "current_streak_days": False}
+
+
+def test_numeric_overrides_are_coerced_or_rejected(tmp_path: Path) -> None:
+    pytest.importorskip("yaml")
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        'longest_streak_days: "42"\ntotal_contributions: 1200.0\n'
+        'metric_overrides:\n  longest_streak_days: "40"\n  weekend_ratio: "0.3"\n',
+        encoding="utf-8",
+    )
+    overrides = fetcher_mod._load_config(config_path)
+    assert overrides.longest_streak_days == 42
+    assert overrides.total_contributions == 1200
+    assert overrides.metric_overrides == {"longest_streak_days": 40, "weekend_ratio": "0.3"}
+    data = GitHubDataFetcher().fetch("octocat", config_path=config_path)
+    assert data.wrapped.longest_streak_days == 42
+    config_path.write_text("metric_overrides:\n  longest_streak_days: forever\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="longest_streak_days"):
+        fetcher_mod._load_config(config_path)
+
+
+def _fake_backfill_graphql(fail_from: set[str]):
+    """Fake _graphql: createdAt ~3 years ago, 10 contributions per window; fails for listed from-dates."""
+    from datetime import datetime, timedelta
+
+    created = (datetime.utcnow() - timedelta(days=3 * 365 + 30)).strftime("%Y-%m-%dT00:00:00Z")
+    calls: list[str] = []
+
+    def fake(token, query, variables=None):
+        variables = variables or {}
+        if "createdAt" in query:
+            return {"data": {"user": {"createdAt": created, "contributionsCollection": {
+                "contributionCalendar": {"totalContributions": 5, "weeks": []},
+            }}}}
+        calls.append(variables["from"])
+        if variables["from"][:10] in fail_from:
+            raise fetcher_mod.urllib.error.URLError("boom")
+        return {"data": {"user": {"contributionsCollection": {
+            "contributionCalendar": {"totalContributions": 10},
+        }}}}
+
+    return fake, calls
+
+
+def test_backfill_resumes_from_checkpoint(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """A failed window marks the total partial; the next run only fetches missing windows."""
+    fake, calls = _fake_backfill_graphql(fail_from=set())
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    _, total, _, complete, _, _ = fetcher_mod._fetch_contributions("t", "octocat", tmp_path)
+    assert (total, complete) == (40, True)
+    assert len(calls) == 4
+
+    # Second run: windows sealed before the past year come from the checkpoint; the rest are refetched.
+    calls.clear()
+    _, total, _, complete, _, _ = fetcher_mod._fetch_contributions("t", "octocat", tmp_path)
+    assert (total, complete) == (40, True)
+    assert len(calls) == 2
+
+
+def test_backfill_failure_is_partial_and_resumable(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    fake, calls = _fake_backfill_graphql(fail_from=set())
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    fetcher_mod._fetch_contributions("t", "octocat", None)
+    second_window = calls[1][:10]
+
+    fake, calls = _fake_backfill_graphql(fail_from={second_window})
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    _, total, _, complete, _, _ = fetcher_mod._fetch_contributions("t", "octocat", tmp_path)
+    assert complete is False
+    assert total == 10
+
+    fake, calls = _fake_backfill_graphql(fail_from=set())
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    _, total, _, complete, _, _ = fetcher_mod._fetch_contributions("t", "octocat", tmp_path)
+    assert (total, complete) == (40, True)
+    assert calls[0][:10] == second_window
+    assert len(calls) == 3
+
+
+def _fake_activity_graphql(pages_per_repo: int):
+    """Fake _graphql for the commit activity stage: two repos, 3 commits per history page."""
+    requested: list[tuple[str, str | None]] = []
+
+    def fake(token, query, variables=None):
+        variables = variables or {}
+        if "commitContributionsByRepository" in query:
+            return {"data": {"user": {"id": "U1", "contributionsCollection": {
+                "commitContributionsByRepository": [
+                    {"repository": {"name": "alpha", "owner": {"login": "me"}}, "contributions": {"totalCount": 7}},
+                    {"repository": {"name": "beta", "owner": {"login": "org"}}, "contributions": {"totalCount": 40}},
+                ],
+            }}}}
+        name, after = variables["name"], variables["after"]
+        requested.append((name, after))
+        page = int(after or 0)
+        hour = "09" if name == "alpha" else "22"
+        nodes = [
+            # Rebased later in the day: the hour must come from authoredDate.
+            {"authoredDate": f"2024-05-0{i + 1}T{hour}:15:00Z", "committedDate": f"2024-05-0{i + 1}T23:59:00Z"}
+            for i in range(3 if name == "alpha" else 1)
+        ]
+        return {"data": {"repository": {"defaultBranchRef": {"target": {"history": {
+            "pageInfo": {"hasNextPage": page + 1 < pages_per_repo, "endCursor": str(page + 1)},
+            "nodes": nodes,
+        }}}}}}
+
+    return fake, requested
+
+
+def test_commit_activity_histograms(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake, requested = _fake_activity_graphql(pages_per_repo=2)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    activity = fetcher_mod._fetch_commit_activity("t", "me", max_pages=10)
+    assert activity is not None
+    assert activity.most_active_hour == "09:00 UTC"
+    assert activity.hour_histogram[9] == 6
+    assert activity.hour_histogram[22] == 2
+    assert activity.hour_histogram[23] == 0
+    # Ranked by the exact contribution counts, not by the commits the page walk saw.
+    assert activity.top_repositories == [("org/beta", 40), ("me/alpha", 7)]
+    assert activity.complete is True
+    assert len(requested) == 4
+
+
+def test_commit_activity_respects_page_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake, requested = _fake_activity_graphql(pages_per_repo=50)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    activity = fetcher_mod._fetch_commit_activity("t", "me", max_pages=5)
+    assert activity is not None
+    assert len(requested) == 5
+    assert activity.complete is False
+    assert 0 < sum(activity.hour_histogram) <= 5 * 3
+    assert activity.top_repositories == [("org/beta", 40), ("me/alpha", 7)]
+    assert fetcher_mod._fetch_commit_activity("t", "me", max_pages=0) is None
+
+
+def test_fleet_rank_and_power_from_percentiles(tmp_path: Path) -> None:
+    from profile_stats.ranking import FleetRanking
+
+    from datetime import datetime
+
+    ranking = FleetRanking(epoch=datetime.utcnow().strftime("%Y-%m"))
+    for i in range(200):
+        ranking.add_user(i * 10, i / 2)
+    fetcher_mod._record_fleet_user(ranking, "Me", 1995, 99.9)
+    fetcher_mod._record_fleet_user(ranking, "me", 1995, 99.9)  # same epoch: not re-added
+    assert ranking.size == 201
+    assert fetcher_mod._fleet_rank_and_power(ranking, 1995, 99.9) == ("Top 1%", "Legendary")
+    assert fetcher_mod._fleet_rank_and_power(ranking, 0, 0.0) == ("Top 100%", "Newcomer")
+
+
+def _fake_org_graphql(pages: int, fail_page: int | None = None):
+    """Fake _graphql for org repositories: per page one Go repo, one Python repo and one fork."""
+    pages_read: list[int] = []
+
+    def fake(token, query, variables=None):
+        variables = variables or {}
+        page = int(variables.get("after") or 0)
+        connection = {"pageInfo": {"hasNextPage": page + 1 < pages, "endCursor": str(page + 1)}}
+        if "languages" in query:
+            pages_read.append(page)
+            if page == fail_page:
+                raise fetcher_mod.urllib.error.URLError("boom")
+            connection["nodes"] = [
+                {"isFork": False, "languages": {"edges": [{"size": 900, "node": {"name": "Go", "color": "#00ADD8"}}]}},
+                {"isFork": False, "languages": {"edges": [{"size": 100, "node": {"name": "Python", "color": None}}]}},
+                {"isFork": True, "languages": {"edges": [{"size": 10**6, "node": {"name": "C", "color": None}}]}},
+            ]
+        org = {"repositories": connection}
+        if variables.get("withTeam"):
+            org = {"team": org}
+        return {"data": {"organization": org}}
+
+    return fake, pages_read
+
+
+def test_org_languages_map_reduce(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake, pages_read = _fake_org_graphql(pages=7)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    result = fetcher_mod._fetch_org_languages("t", "acme", team="core", page_size=3, max_workers=3)
+    assert sorted(pages_read) == list(range(7))
+    assert result.repositories == 14
+    assert result.complete is True
+    assert [(e.name, e.percent) for e in result.languages] == [("Go", 90.0), ("Python", 10.0)]
+    assert result.languages[0].color == "#00ADD8"
+
+
+def test_org_languages_partial_on_failed_page_or_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake, _ = _fake_org_graphql(pages=5, fail_page=2)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    result = fetcher_mod._fetch_org_languages("t", "acme")
+    assert result.complete is False
+    assert result.repositories == 8
+    fake, pages_read = _fake_org_graphql(pages=5)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    result = fetcher_mod._fetch_org_languages("t", "acme", max_pages=2)
+    assert result.complete is False
+    assert sorted(pages_read) == [0, 1]
+
+
+def test_partial_org_card_keeps_existing_svg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    import generate_github_profile_stats as cli
+
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    fake, _ = _fake_org_graphql(pages=3)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    argv = ["--org", "acme", "--output-dir", str(tmp_path), "--state-dir", str(tmp_path / "state")]
+    assert cli.main(argv) == 0
+    card = tmp_path / "acme-language-stats.svg"
+    content = card.read_text(encoding="utf-8")
+    assert "Total Repositories" in content and "Total Contributions" not in content
+
+    fake, _ = _fake_org_graphql(pages=3, fail_page=1)
+    monkeypatch.setattr(fetcher_mod, "_graphql", fake)
+    data = GitHubDataFetcher().fetch_organization("acme")
+    assert data.languages_complete is False
+    assert data.contribution.total_complete is True
+    assert data.repositories == 4
+    assert cli.main(argv) == 1
+    assert card.read_text(encoding="utf-8") == content
+
+
+def test_tree_reduce_keeps_one_partial_per_level() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    merges: list[tuple[int, int]] = []
+
+    def merge(a: int, b: int) -> int:
+        merges.append((a, b))
+        return a + b
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        total = fetcher_mod._tree_reduce(pool, range(1, 101), lambda x: x, merge, 0, max_in_flight=4)
+    assert total == 5050
+    # 100 leaves need 99 pairwise merges plus at most one fold per remaining level.
+    assert len(merges) <= 99 + 7
+
+
+def test_failed_fetch_is_not_recorded_in_fleet(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    from profile_stats.ranking import FleetRanking
+
+    def failing(token, query, variables=None):
+        raise fetcher_mod.urllib.error.URLError("down")
+
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(fetcher_mod, "_graphql", failing)
+    ranking = FleetRanking()
+    GitHubDataFetcher(state_dir=tmp_path, ranking=ranking).fetch("alice")
+    assert ranking.size == 0
+    assert "alice" not in ranking.users
+    assert list(tmp_path.glob("*fleet*")) == []
+
+
+def _stub_sections(monkeypatch: pytest.MonkeyPatch, **sections) -> dict:
+    """Replace the per-section fetches with canned results (values may be exceptions to raise)."""
+    from profile_stats.types import LanguageEntry
+
+    results = {
+        "calendar": fetcher_mod._PastYear(300, [], None),
+        "total": fetcher_mod._Contributions(300, 900, [], True, {}, None),
+        "languages": [LanguageEntry("Go", 100.0, "#00ADD8")],
+        "activity": None,
+        **sections,
+    }
+
+    def stub(name):
+        def fetch(*args, **kwargs):
+            if isinstance(results[name], Exception):
+                raise results[name]
+            return results[name]
+        return fetch
+
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(fetcher_mod, "_fetch_past_year", stub("calendar"))
+    monkeypatch.setattr(fetcher_mod, "_backfill_contributions", stub("total"))
+    monkeypatch.setattr(fetcher_mod, "_fetch_languages", stub("languages"))
+    monkeypatch.setattr(fetcher_mod, "_fetch_commit_activity", stub("activity"))
+    return results
+
+
+def test_fleet_records_fetched_values_not_overrides(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    pytest.importorskip("yaml")
+    from profile_stats.ranking import FleetRanking
+
+    _stub_sections(monkeypatch)
+    recorded: list[tuple[str, int, float]] = []
+    monkeypatch.setattr(
+        fetcher_mod, "_record_fleet_user", lambda ranking, user, past, score: recorded.append((user, past, score)),
+    )
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        "past_year_contributions: 99999\ntotal_contributions: 99999\nlongest_streak_days: 365\n",
+        encoding="utf-8",
+    )
+    data = GitHubDataFetcher(ranking=FleetRanking()).fetch("alice", config_path=config_path)
+    assert data.contribution.past_year == 99999
+    assert recorded == [("alice", 300, fetcher_mod._power_score(900, 0, 1))]
+
+
+def test_fleet_skips_users_whose_languages_failed(monkeypatch: pytest.MonkeyPatch) -> None:
+    from profile_stats.ranking import FleetRanking
+
+    _stub_sections(monkeypatch, languages=None)
+    ranking = FleetRanking()
+    data = GitHubDataFetcher(ranking=ranking).fetch("alice")
+    assert data.languages == []
+    assert ranking.size == 0
+
+
+def test_failed_refresh_keeps_cached_sections(monkeypatch: pytest.MonkeyPatch) -> None:
+    from profile_stats.types import ActivityStats
+
+    activity = ActivityStats("09:00 UTC", [0] * 24, [("me/alpha", 3)])
+    results = _stub_sections(monkeypatch, activity=activity)
+    fetcher = GitHubDataFetcher()
+    assert fetcher.refresh("alice", fetcher_mod.SECTIONS).failed_sections == []
+    down = fetcher_mod.urllib.error.URLError("down")
+    results.update(
+        calendar=None, languages=None, activity=down,
+        total=fetcher_mod._Contributions(300, 20, [], False, {}, None),
+    )
+    data = fetcher.refresh("alice", fetcher_mod.SECTIONS)
+    assert sorted(data.failed_sections) == ["activity", "calendar", "languages", "total"]
+    assert (data.contribution.total, data.contribution.total_complete) == (900, True)
+    assert [e.name for e in data.languages] == ["Go"] and data.languages_complete
+    assert data.activity is activity
+
+
+def test_languages_never_fetched_are_incomplete(monkeypatch: pytest.MonkeyPatch) -> None:
+    _stub_sections(monkeypatch, languages=None)
+    data = GitHubDataFetcher().refresh("alice", ["languages"])
+    assert data.failed_sections == ["languages"]
+    assert data.languages_complete is False
@@ -0,0 +1,63 @@
+"""Tests for the columnar daily stats history."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from profile_stats.history import COLUMNS, HistoryReader, append_history, read_totals
+from profile_stats.types import (
+    ContributionStats,
+    LanguageEntry,
+    ProfileStatsData,
+    WrappedMetrics,
+)
+
+
+def _data(total: int, top: str = "Go") -> ProfileStatsData:
+    return ProfileStatsData(
+        contribution=ContributionStats(past_year=total // 2, total=total),
+        languages=[LanguageEntry(top, 60.0, "#00ADD8"), LanguageEntry("Python", 40.0, "#3572A5")],
+        wrapped=WrappedMetrics("Top 15%", 12, "October", "Thursday", top, "Pro Mode"),
+    )
+
+
+def test_append_and_range_scan(tmp_path: Path) -> None:
+    start = date(2025, 1, 1)
+    for i in range(30):
+        append_history(tmp_path, "Octocat", _data(100 + i), start + timedelta(days=i))
+    with HistoryReader(tmp_path, "octocat") as reader:
+        assert len(reader) == 30
+        cols = reader.scan(start + timedelta(days=10), start + timedelta(days=12))
+        assert cols["total"].tolist() == [110, 111, 112]
+        assert cols["day"][0] == (start + timedelta(days=10)).toordinal()
+        assert len(cols["language_ids"]) == 3 * 10
+        assert reader.string(cols["language_ids"][1]) == "Python"
+        assert reader.string(cols["most_active_month"][0]) == "October"
+        assert abs(cols["language_percents"][0] - 60.0) < 1e-6
+        for view in cols.values():
+            view.release()
+    assert read_totals(tmp_path, "octocat", start + timedelta(days=28)) == [128, 129]
+
+
+def test_same_day_overwrites_and_torn_append_is_repaired(tmp_path: Path) -> None:
+    day = date(2025, 3, 1)
+    append_history(tmp_path, "me", _data(10), day)
+    append_history(tmp_path, "me", _data(11), day)
+    assert read_totals(tmp_path, "me") == [11]
+
+    # Simulate a crash that appended to one column only.
+    with open(tmp_path / "me" / "total.col", "ab") as f:
+        f.write(b"\x00" * 8)
+    assert read_totals(tmp_path, "me") == [11]
+    append_history(tmp_path, "me", _data(12), day + timedelta(days=1))
+    assert read_totals(tmp_path, "me") == [11, 12]
+    sizes = {name: (tmp_path / "me" / f"{name}.col").stat().st_size for name, _, _ in COLUMNS}
+    assert sizes["total"] == 16 and sizes["day"] == 8
+
+    with pytest.raises(ValueError):
+        append_history(tmp_path, "me", _data(13), day)
+
+
+def test_missing_history_reads_empty(tmp_path: Path) -> None:
+    assert read_totals(tmp_path, "nobody") == []
@@ -0,0 +1,125 @@
+"""Tests for the KLL sketch and fleet ranking."""
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+from profile_stats.ranking import BloomFilter, FleetRanking, KllSketch
+
+
+def test_kll_rank_is_close_to_exact_with_bounded_memory() -> None:
+    rng = random.Random(1)
+    values = [rng.randint(0, 5000) for _ in range(100_000)]
+    sketch = KllSketch(k=200, seed=3)
+    for v in values:
+        sketch.update(v)
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        probe = ordered[int(q * len(ordered))]
+        exact = sum(1 for v in values if v < probe) / len(values)
+        assert abs(sketch.rank(probe) - exact) < 0.02
+    assert sum(len(c) for c in sketch.compactors) < 2000
+    assert sketch.n == len(values)
+
+
+def test_kll_merge_matches_single_stream() -> None:
+    rng = random.Random(2)
+    values = [rng.random() for _ in range(40_000)]
+    parts = [KllSketch(seed=i) for i in range(4)]
+    for i, v in enumerate(values):
+        parts[i % 4].update(v)
+    merged = parts[0]
+    for p in parts[1:]:
+        merged.merge(p)
+    assert merged.n == len(values)
+    assert abs(merged.rank(0.25) - 0.25) < 0.03
+    assert abs(merged.quantile(0.75) - 0.75) < 0.03
+
+
+def test_fleet_ranking_round_trips_and_ranks(tmp_path: Path) -> None:
+    ranking = FleetRanking()
+    for i in range(1000):
+        ranking.add_user(i, i / 10)
+    path = tmp_path / "fleet.json"
+    ranking.save(path)
+    loaded = FleetRanking.load(path)
+    assert loaded.size == 1000
+    assert loaded.top_percent("contributions", 990) <= 2
+    assert 45 <= loaded.top_percent("contributions", 500) <= 55
+    assert loaded.top_percent("contributions", 0) == 100
+    assert FleetRanking.load(tmp_path / "missing.json").size == 0
+
+
+def test_fleet_counts_each_user_once_per_epoch(tmp_path: Path) -> None:
+    ranking = FleetRanking(epoch="2026-01")
+    for i in range(150):
+        assert ranking.add_user(i, i / 10, user=f"user{i}")
+    assert not ranking.add_user(10_000, 1_000.0, user="USER3")
+    assert ranking.size == 150
+    path = tmp_path / "fleet.json"
+    ranking.save(path)
+    loaded = FleetRanking.load(path)
+    assert loaded.epoch == "2026-01" and "user3" in loaded.users
+    # A new epoch starts empty; last epoch's sketch answers until it has enough users.
+    loaded.start_epoch("2026-02")
+    assert "user3" not in loaded.users
+    assert loaded.size == 150
+    assert loaded.add_user(5, 0.5, user="user3")
+    assert loaded.size == 150
+    for i in range(100):
+        loaded.add_user(1000 + i, 1.0, user=f"new{i}")
+    assert loaded.size == 101
+    assert loaded.top_percent("contributions", 0) == 100
+
+
+def test_bloom_filter_is_fixed_size_with_few_false_positives() -> None:
+    bloom = BloomFilter(capacity=10_000)
+    size = len(bloom.to_dict()["data"])
+    for i in range(10_000):
+        bloom.add(f"user{i}")
+    assert all(f"user{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives < 200
+    assert len(bloom._array) == (bloom.bits + 7) // 8 < 13_000
+    assert size < len(bloom.to_dict()["data"])  # only the compressed encoding grows
+    restored = BloomFilter.from_dict(bloom.to_dict())
+    assert "user42" in restored and restored.bits == bloom.bits
+
+
+def test_worker_deltas_merge_the_base_once(tmp_path: Path) -> None:
+    base = FleetRanking(epoch="2026-02")
+    for i in range(100):
+        base.add_user(i, 1.0, user=f"base{i}")
+    base_path = tmp_path / "fleet.json"
+    base.save(base_path)
+    deltas = []
+    for worker in ("a", "b"):
+        ranking = FleetRanking.load(base_path)
+        ranking.delta = FleetRanking()
+        assert not ranking.add_user(5, 1.0, user="base7")  # counted already
+        assert ranking.add_user(5, 1.0, user=f"new-{worker}")
+        assert ranking.size == 101
+        path = tmp_path / f"delta-{worker}.json"
+        ranking.delta.save(path)
+        deltas.append(path)
+    coordinator = FleetRanking.load(base_path)
+    for path in deltas:
+        coordinator.merge(FleetRanking.load(path))
+    assert coordinator.size == 102
+    assert "new-a" in coordinator.users and "new-b" in coordinator.users
+    old = FleetRanking(epoch="2026-01")
+    old.add_user(1, 1.0, user="x")
+    coordinator.merge(old)
+    assert coordinator.size == 102
+    assert coordinator.previous is not None and coordinator.previous["contributions"].n == 1
+
+
+def test_legacy_user_lists_still_dedupe(tmp_path: Path) -> None:
+    import json
+
+    path = tmp_path / "fleet.json"
+    FleetRanking(epoch="2026-02").save(path)
+    raw = json.loads(path.read_text())
+    raw["users"] = ["alice"]
+    path.write_text(json.dumps(raw))
+    assert not FleetRanking.load(path).add_user(1, 1.0, user="Alice")
@@ -86,3 +86,83 @@ def test_render_stats_is_valid_svg() -> None:
         content = path.read_text()
         assert content.strip().startswith("<svg ")
         assert "</svg>" in content
+
+
+def test_render_wrapped_includes_extra_metric_rows() -> None:
+    """Enabled optional metrics are appended as rows and grow the card."""
+    renderer = SvgRendererImpl()
+    data = _sample_data()
+    data.wrapped.extra = [("Weekend Share", "12%"), ("Busiest Week", "Week of Jan 08, 2024")]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "wrapped.svg"
+        renderer.render_wrapped(data, path)
+        content = path.read_text()
+        assert 'height="340"' in content
+        assert "Weekend Share" in content
+        assert "Week of Jan 08, 2024" in content
+
+
+def test_render_heatmap_groups_cells_by_level() -> None:
+    """Heatmap defines the cell once, groups cells per level, and only spells out non-empty days."""
+    from profile_stats.types import ContributionCalendar
+
+    renderer = SvgRendererImpl()
+    data = _sample_data()
+    # 2023-12-31 is a Sunday, so the 364 days fill 52 full weeks with no partial columns.
+    data.calendar = ContributionCalendar("2023-12-31", [0] * 360 + [1, 2, 3, 9])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "heatmap.svg"
+        renderer.render_heatmap(data, path)
+        content = path.read_text()
+    assert content.strip().startswith("<svg ")
+    assert "Contribution Heatmap" in content
+    assert "15 contributions in the past year" in content
+    assert content.count('<rect id="c"') == 1
+    # 4 active days + 5 legend swatches + 1 pattern tile; empty full weeks come from the pattern.
+    assert content.count("<use ") == 10
+    assert 'fill="url(#e)"' in content
+    for color in ("#0e4429", "#006d32", "#26a641", "#39d353"):
+        assert f'<g fill="{color}">' in content
+
+
+def test_render_heatmap_without_calendar_is_valid_svg() -> None:
+    renderer = SvgRendererImpl()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "heatmap.svg"
+        renderer.render_heatmap(_sample_data(), path, years=5)
+        content = path.read_text()
+    assert "0 contributions in the last 5 years" in content
+    assert "</svg>" in content
+
+
+def test_render_heatmap_labels_covered_span_and_tops_uniform_days() -> None:
+    from profile_stats.types import ContributionCalendar
+
+    renderer = SvgRendererImpl()
+    data = _sample_data()
+    # A partial backfill: only one year of days although five were asked for.
+    data.calendar = ContributionCalendar("2023-12-31", [0, 2] * 182)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "heatmap.svg"
+        renderer.render_heatmap(data, path, years=5)
+        content = path.read_text()
+    assert "364 contributions since Dec 2023" in content
+    assert "last 5 years" not in content
+    # Every active day has the same count: all of them get the top shade.
+    assert '<g fill="#39d353">' in content
+    assert '<g fill="#0e4429">' not in content
+
+
+def test_render_stats_draws_sparkline_from_history() -> None:
+    renderer = SvgRendererImpl()
+    data = _sample_data()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "stats.svg"
+        renderer.render_stats(data, path)
+        assert "<polyline" not in path.read_text()
+        data.total_history = list(range(1500, 2027))
+        renderer.render_stats(data, path)
+        content = path.read_text()
+    assert content.count("<polyline") == 1
+    points = content.split('points="')[1].split('"')[0].split()
+    assert len(points) <= 130
@@ -0,0 +1,172 @@
+"""Tests for the per-section refresh scheduler."""
+from __future__ import annotations
+
+import json
+import random
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import profile_stats.scheduler as scheduler_mod
+from profile_stats.scheduler import (
+    RefreshScheduler,
+    RequestBudget,
+    SectionPolicy,
+    parse_duration,
+)
+
+_HOUR = timedelta(hours=1)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class _FakeFetcher:
+    """Records refresh calls; each refreshed section costs `cost` requests."""
+
+    def __init__(self, recent: dict[str, int], cost: int = 2) -> None:
+        self.recent = recent
+        self.cost = cost
+        self.calls: list[tuple[str, list[str]]] = []
+        self.requests = 0
+        self.failing: set[str] = set()
+
+    def recent_contributions(self, username: str, days: int = 7) -> int:
+        return self.recent.get(username, 0)
+
+    def refresh(self, username, sections, config_path=None):
+        self.calls.append((username, sorted(sections)))
+        self.requests += self.cost * len(sections)
+        return SimpleNamespace(failed_sections=[s for s in sections if s in self.failing])
+
+
+def _policies(**hours: float) -> dict[str, SectionPolicy]:
+    return {name: SectionPolicy(timedelta(hours=h), jitter=0.0, cost=2) for name, h in hours.items()}
+
+
+@pytest.fixture
+def fetcher(monkeypatch: pytest.MonkeyPatch) -> _FakeFetcher:
+    fake = _FakeFetcher({"busy": 50, "quiet": 0})
+    monkeypatch.setattr(scheduler_mod, "request_count", lambda: fake.requests)
+    return fake
+
+
+def test_parse_duration() -> None:
+    assert parse_duration("30m") == timedelta(minutes=30)
+    assert parse_duration("6h") == timedelta(hours=6)
+    assert parse_duration("7d") == timedelta(days=7)
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_budget_sliding_window() -> None:
+    budget = RequestBudget(per_hour=10)
+    budget.spend(6, now=0)
+    budget.spend(4, now=600)
+    assert budget.available(900) == 0
+    assert budget.wait_time(5, now=900) == 3600 - 900
+    assert budget.wait_time(5, now=3600) == 0
+
+
+def test_sections_follow_their_own_intervals(fetcher: _FakeFetcher, tmp_path: Path) -> None:
+    clock = _Clock()
+    sched = RefreshScheduler(
+        fetcher, ["busy"], policies=_policies(calendar=1, total=4, languages=24, activity=4),
+        state_path=tmp_path / "scheduler.json", clock=clock, sleep=clock.sleep,
+    )
+    sched.run(max_refreshes=1)
+    assert fetcher.calls == [("busy", ["activity", "calendar", "languages", "total"])]
+    fetcher.calls.clear()
+    sched.run(max_refreshes=4)
+    # Within four hours only the hourly calendar comes due; then total and activity join it.
+    assert fetcher.calls[:3] == [("busy", ["calendar"])] * 3
+    assert fetcher.calls[3] == ("busy", ["activity", "calendar", "total"])
+    state = json.loads((tmp_path / "scheduler.json").read_text())
+    assert set(state["busy"]) == {"calendar", "total", "languages", "activity"}
+
+
+def test_restart_resumes_from_state(fetcher: _FakeFetcher, tmp_path: Path) -> None:
+    clock = _Clock()
+    kwargs = dict(
+        policies=_policies(calendar=1, total=4, languages=24, activity=4),
+        state_path=tmp_path / "scheduler.json", clock=clock, sleep=clock.sleep,
+    )
+    RefreshScheduler(fetcher, ["busy"], **kwargs).run(max_refreshes=1)
+    fetcher.calls.clear()
+    clock.now += 2 * 3600
+    RefreshScheduler(fetcher, ["busy"], **kwargs).run(max_refreshes=1)
+    assert fetcher.calls == [("busy", ["calendar"])]
+
+
+def test_active_users_go_first_and_budget_is_respected(fetcher: _FakeFetcher) -> None:
+    clock = _Clock()
+    sched = RefreshScheduler(
+        fetcher, ["quiet", "busy"], policies=_policies(calendar=1, total=24, languages=24, activity=24),
+        requests_per_hour=20, clock=clock, sleep=clock.sleep, rng=random.Random(1),
+    )
+    # First pass: every section is new, 8 requests per user.
+    sched.run(max_refreshes=2)
+    fetcher.calls.clear()
+    clock.now += 2 * 3600
+    start = clock.now
+    sched.run(max_refreshes=2)
+    # Both calendars are equally stale; the user with recent contributions wins.
+    assert [user for user, _ in fetcher.calls] == ["busy", "quiet"]
+    spent: list[tuple[float, int]] = []
+    original = sched.budget.spend
+    sched.budget.spend = lambda cost, now: (spent.append((now, cost)), original(cost, now))
+    sched.run(max_refreshes=20)
+    for now, _ in spent:
+        window = sum(c for t, c in spent if now - 3600 < t <= now)
+        assert window <= 20
+    assert clock.now > start
+
+
+def test_blocked_batch_neither_spins_nor_blocks_smaller_ones(fetcher: _FakeFetcher) -> None:
+    clock = _Clock()
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.sleep(seconds)
+
+    sched = RefreshScheduler(
+        fetcher, ["busy", "quiet"], policies=_policies(calendar=24, total=24, languages=24, activity=24),
+        requests_per_hour=20, clock=clock, sleep=sleep,
+    )
+    sched.budget.spend(15, clock.now)
+    for section in ("calendar", "total", "languages", "activity"):
+        sched._costs[("quiet", section)] = 1
+    # busy (estimate 8) does not fit; quiet (estimate 4) goes ahead of it.
+    assert sched.run_once()
+    assert fetcher.calls == [("quiet", ["activity", "calendar", "languages", "total"])]
+    assert not sched.run_once()
+    assert sched.seconds_until_next() == 300.0  # budget frees in an hour; capped, not a 1 s spin
+    sched.run(max_refreshes=1)
+    assert fetcher.calls[-1][0] == "busy"
+    assert len(sleeps) == 12
+
+
+def test_failed_sections_are_retried_not_marked_fresh(fetcher: _FakeFetcher, tmp_path: Path) -> None:
+    clock = _Clock()
+    sched = RefreshScheduler(
+        fetcher, ["busy"], policies=_policies(calendar=6, total=24, languages=24, activity=24),
+        state_path=tmp_path / "scheduler.json", clock=clock, sleep=clock.sleep,
+    )
+    fetcher.failing = {"languages"}
+    sched.run(max_refreshes=1)
+    assert "languages" not in sched.last_refresh["busy"]
+    fetcher.failing = set()
+    sched.run(max_refreshes=1)
+    assert fetcher.calls[-1] == ("busy", ["languages"])
+    assert clock.now - 1_000_000.0 == 15 * 60
+    assert "languages" in sched.last_refresh["busy"]
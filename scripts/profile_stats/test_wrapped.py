@@ -0,0 +1,86 @@
+"""Tests for the incremental wrapped-metrics aggregator."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from profile_stats.wrapped import METRICS, Metric, WrappedAggregator, enabled_metrics
+
+
+def _weeks(start: date, counts: list[int]) -> list[dict]:
+    days = [
+        {"date": (start + timedelta(days=i)).isoformat(), "contributionCount": c}
+        for i, c in enumerate(counts)
+    ]
+    return [{"contributionDays": days[i:i + 7]} for i in range(0, len(days), 7)]
+
+
+def test_streak_carries_across_window_edges() -> None:
+    """A streak spanning two overlapping windows is counted once, end to end."""
+    agg = WrappedAggregator(past_year_start=date(2024, 1, 1))
+    agg.add_weeks(_weeks(date(2023, 12, 20), [0] + [1] * 12))  # Dec 21 .. Jan 1
+    agg.add_weeks(_weeks(date(2024, 1, 1), [1] * 5 + [0]))  # overlaps on Jan 1
+    periods = agg.results()
+    assert periods["all_time"].metrics["longest_streak_days"] == 16
+    assert periods["all_time"].metrics["total"] == 16
+    assert periods["past_year"].metrics["longest_streak_days"] == 5
+    assert periods["2023"].metrics["longest_streak_days"] == 11
+    assert periods["2024"].metrics["total"] == 5
+
+
+def test_most_active_month_and_day() -> None:
+    agg = WrappedAggregator(past_year_start=date.min)
+    agg.add_weeks(_weeks(date(2024, 1, 29), [1, 1, 1, 9, 0, 0, 0]))  # Mon Jan 29 .. Sun Feb 4
+    result = agg.results()["all_time"].metrics
+    assert result["most_active_month"] == "February"
+    assert result["most_active_day"] == "Thursday"
+
+
+def test_snapshot_resume_matches_single_pass() -> None:
+    counts = [(i * 7) % 5 for i in range(800)]
+    start = date(2020, 3, 1)
+    past_year_start = start + timedelta(days=600)
+
+    single = WrappedAggregator(past_year_start)
+    single.add_weeks(_weeks(start, counts))
+
+    first = WrappedAggregator(past_year_start)
+    first.add_weeks(_weeks(start, counts[:400]))
+    resumed = WrappedAggregator.from_state(past_year_start, first.to_state())
+    resumed.add_weeks(_weeks(start + timedelta(days=400), counts[400:]))
+
+    assert resumed.results() == single.results()
+
+
+def test_optional_metrics_toggle_and_values() -> None:
+    names = [m.name for m in enabled_metrics({"weekend_ratio": True, "most_active_day": False})]
+    assert "weekend_ratio" in names
+    assert "most_active_day" in names  # core metrics cannot be disabled
+    assert "busiest_week" not in names
+
+    metrics = enabled_metrics({
+        "current_streak_days": True, "busiest_week": True,
+        "average_per_active_day": True, "weekend_ratio": True,
+    })
+    agg = WrappedAggregator(past_year_start=date.min, metrics=metrics)
+    # Mon Jan 1 2024 .. Sun Jan 14: week two is busier, last day is quiet.
+    agg.add_weeks(_weeks(date(2024, 1, 1), [1, 0, 0, 0, 0, 2, 2] + [3, 3, 3, 3, 3, 1, 0]))
+    result = agg.results()["all_time"].metrics
+    assert result["current_streak_days"] == 8
+    assert result["busiest_week"] == "Week of Jan 08, 2024"
+    assert result["average_per_active_day"] == round(21 / 9, 2)
+    assert result["weekend_ratio"] == round(5 / 21, 4)
+
+
+def test_registered_metrics_share_one_sweep() -> None:
+    """All metrics are fed from one pass: a one-shot iterator is enough."""
+    seen: list[int] = []
+    probe = Metric(
+        name="probe", label="Probe", init=lambda: 0,
+        update=lambda s, d, c: seen.append(c) or s + 1, finalize=lambda s: s,
+    )
+    days = iter([((date(2024, 1, 1) + timedelta(days=i)).isoformat(), i % 3) for i in range(30)])
+    agg = WrappedAggregator(past_year_start=date.max, metrics=list(METRICS.values()) + [probe])
+    agg.add_days(days)
+    result = agg.results()["all_time"].metrics
+    assert result["probe"] == 30
+    assert result["total"] == sum(i % 3 for i in range(30))
@@ -4,8 +4,8 @@ Used by the generator script and by tests. No implementation logic here.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
 
 
 @dataclass(frozen=True)
@@ -27,14 +27,52 @@ class WrappedMetrics:
     most_active_day: str
     top_language: str
     power_level: str
+    # Additional card rows (optional metrics, commit activity) as (label, display value).
+    extra: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class WrappedPeriod:
+    """Calendar-derived wrapped metrics for one period (all-time, past year or a calendar year).
+
+    metrics maps registered metric name to its finalized value.
+    """
+
+    metrics: Dict[str, Any]
+
+
+@dataclass
+class ContributionCalendar:
+    """Per-day contribution counts, one entry per consecutive day from start (ISO date)."""
+
+    start: str
+    counts: Sequence[int]
 
 
 @dataclass
 class ContributionStats:
-    """Contribution numbers for the stats SVG."""
+    """Contribution numbers for the stats SVG.
+
+    total_complete is False when the all-time backfill stopped early and total
+    is only a partial sum.
+    """
 
     past_year: int
     total: int
+    total_complete: bool = True
+
+
+@dataclass
+class ActivityStats:
+    """Commit-level activity from per-repository commit history (past year).
+
+    complete is False when the per-user page cap stopped the scan early.
+    """
+
+    most_active_hour: str  # e.g. "14:00 UTC"
+    hour_histogram: List[int]  # 24 commit counts, index = UTC hour
+    top_repositories: List[Tuple[str, int]]  # (owner/name, commits), busiest first
+    complete: bool = True
 
 
 @dataclass
@@ -44,6 +82,18 @@ class ProfileStatsData:
     contribution: ContributionStats
     languages: List[LanguageEntry]
     wrapped: WrappedMetrics
+    # Keyed "all_time", "past_year" and "YYYY"; empty when no calendar was fetched.
+    periods: Dict[str, WrappedPeriod] = field(default_factory=dict)
+    activity: ActivityStats | None = None
+    calendar: ContributionCalendar | None = None
+    # All-time total per stored day, oldest first (from the history store; drives the sparkline).
+    total_history: List[int] = field(default_factory=list)
+    # False when some repositories' languages could not be read (e.g. org pages that failed).
+    languages_complete: bool = True
+    # Set for org/team language cards: repositories aggregated, shown instead of contributions.
+    repositories: int | None = None
+    # Sections whose last refresh failed and still show older cached data (retried by the scheduler).
+    failed_sections: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -58,3 +108,6 @@ class ConfigOverrides:
     top_language: str | None = None
     past_year_contributions: int | None = None
     total_contributions: int | None = None
+    # Metric name -> enabled flag, and metric name -> fixed value.
+    metrics: Dict[str, bool] = field(default_factory=dict)
+    metric_overrides: Dict[str, Any] = field(default_factory=dict)
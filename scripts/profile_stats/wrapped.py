@@ -0,0 +1,379 @@
+"""Incremental wrapped-metrics aggregation over a stream of contribution days.
+
+Each metric is registered once with an initial state, a per-day update and a
+finalize step. The engine fuses every enabled metric into a single pass over
+the calendar, so adding a metric never adds another loop over the days.
+
+Days are fed in ascending date order, one yearly calendar window after another.
+Each period (all-time, past year, one per calendar year) keeps O(1) state per
+metric, so streaks carry across window edges without holding the full day list.
+Metric states are plain JSON values so the stream can be checkpointed.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Iterable, Optional
+
+from .types import ContributionCalendar, WrappedPeriod
+
+MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@dataclass(frozen=True)
+class Metric:
+    """A single-pass wrapped metric.
+
+    init() returns a fresh JSON-serializable state; update(state, day, count)
+    returns the new state (it may mutate and return the same list); finalize
+    turns the state into the metric value and display formats it for the card.
+    Core metrics feed the fixed rows of the wrapped card and are always enabled.
+    """
+
+    name: str
+    label: str
+    init: Callable[[], Any]
+    update: Callable[[Any, date, int], Any]
+    finalize: Callable[[Any], Any]
+    display: Callable[[Any], str] = str
+    core: bool = False
+    default_enabled: bool = True
+
+
+METRICS: dict[str, Metric] = {}
+
+
+def register_metric(metric: Metric) -> Metric:
+    """Add (or replace) a metric in the registry."""
+    METRICS[metric.name] = metric
+    return metric
+
+
+def enabled_metrics(toggles: Optional[dict[str, bool]] = None) -> list[Metric]:
+    """Registered metrics after applying config toggles; core metrics cannot be disabled."""
+    toggles = toggles or {}
+    return [
+        m for m in METRICS.values()
+        if m.core or toggles.get(m.name, m.default_enabled)
+    ]
+
+
+def iter_calendar_days(weeks: list[Any]) -> Iterable[tuple[str, int]]:
+    """Yield (date, count) from contributionCalendar.weeks, skipping malformed days."""
+    for week in weeks or []:
+        for day in week.get("contributionDays") or []:
+            d = day.get("date")
+            if d:
+                yield d, int(day.get("contributionCount") or 0)
+
+
+# --- Built-in metrics -------------------------------------------------------
+
+
+def _total_update(state: int, day: date, count: int) -> int:
+    return state + count
+
+
+def _streak_update(state: list, day: date, count: int) -> list:
+    # state = [last_ordinal, current, longest]; a missing day breaks the streak.
+    ordinal = day.toordinal()
+    if state[0] is not None and ordinal != state[0] + 1:
+        state[1] = 0
+    state[0] = ordinal
+    if count > 0:
+        state[1] += 1
+        state[2] = max(state[2], state[1])
+    else:
+        state[1] = 0
+    return state
+
+
+def _current_streak_update(state: list, day: date, count: int) -> list:
+    # state = [last_ordinal, current, run_before_last_zero]
+    ordinal = day.toordinal()
+    if state[0] is not None and ordinal != state[0] + 1:
+        state[1] = state[2] = 0
+    state[0] = ordinal
+    if count > 0:
+        state[1] += 1
+    else:
+        state[1], state[2] = 0, state[1]
+    return state
+
+
+def _current_streak_finalize(state: list) -> int:
+    # A quiet final day (today, still in progress) does not end the streak yet.
+    return state[1] or state[2]
+
+
+def _bucket_update(key: str, state: list, count: int) -> list:
+    # state = [key, sum, best_key, best_sum]; strictly greater keeps the earliest bucket on ties.
+    if key != state[0]:
+        if state[0] is not None and (state[2] is None or state[1] > state[3]):
+            state[2], state[3] = state[0], state[1]
+        state[0], state[1] = key, 0
+    state[1] += count
+    return state
+
+
+def _bucket_best(state: list) -> Optional[str]:
+    if state[0] is not None and (state[2] is None or state[1] > state[3]):
+        return state[0]
+    return state[2]
+
+
+def _month_update(state: list, day: date, count: int) -> list:
+    return _bucket_update(f"{day.year:04d}-{day.month:02d}", state, count)
+
+
+def _month_finalize(state: list) -> str:
+    best = _bucket_best(state)
+    return MONTH_NAMES[int(best[5:7]) - 1] if best else "—"
+
+
+def _week_update(state: list, day: date, count: int) -> list:
+    return _bucket_update(date.fromordinal(day.toordinal() - day.weekday()).isoformat(), state, count)
+
+
+def _week_finalize(state: list) -> str:
+    best = _bucket_best(state)
+    return f"Week of {date.fromisoformat(best):%b %d, %Y}" if best else "—"
+
+
+def _weekday_update(state: list, day: date, count: int) -> list:
+    state[day.weekday()] += count
+    return state
+
+
+def _weekday_finalize(state: list) -> str:
+    if max(state) <= 0:
+        return "—"
+    return WEEKDAYS[max(range(7), key=lambda i: state[i])]
+
+
+def _average_update(state: list, day: date, count: int) -> list:
+    # state = [sum, active_days]
+    if count > 0:
+        state[0] += count
+        state[1] += 1
+    return state
+
+
+def _weekend_update(state: list, day: date, count: int) -> list:
+    # state = [weekend_sum, total_sum]
+    if day.weekday() >= 5:
+        state[0] += count
+    state[1] += count
+    return state
+
+
+register_metric(Metric(
+    name="total", label="Contributions",
+    init=lambda: 0, update=_total_update, finalize=lambda s: s, core=True,
+))
+register_metric(Metric(
+    name="longest_streak_days", label="Longest Streak",
+    init=lambda: [None, 0, 0], update=_streak_update, finalize=lambda s: s[2],
+    display=lambda v: f"{v} days", core=True,
+))
+register_metric(Metric(
+    name="most_active_month", label="Most Active Month",
+    init=lambda: [None, 0, None, 0], update=_month_update, finalize=_month_finalize, core=True,
+))
+register_metric(Metric(
+    name="most_active_day", label="Most Active Day",
+    init=lambda: [0] * 7, update=_weekday_update, finalize=_weekday_finalize, core=True,
+))
+register_metric(Metric(
+    name="current_streak_days", label="Current Streak",
+    init=lambda: [None, 0, 0], update=_current_streak_update, finalize=_current_streak_finalize,
+    display=lambda v: f"{v} days", default_enabled=False,
+))
+register_metric(Metric(
+    name="busiest_week", label="Busiest Week",
+    init=lambda: [None, 0, None, 0], update=_week_update, finalize=_week_finalize,
+    default_enabled=False,
+))
+register_metric(Metric(
+    name="average_per_active_day", label="Avg per Active Day",
+    init=lambda: [0, 0], update=_average_update,
+    finalize=lambda s: round(s[0] / s[1], 2) if s[1] else 0.0,
+    display=lambda v: f"{v:.2f}", default_enabled=False,
+))
+register_metric(Metric(
+    name="weekend_ratio", label="Weekend Share",
+    init=lambda: [0, 0], update=_weekend_update,
+    finalize=lambda s: round(s[0] / s[1], 4) if s[1] else 0.0,
+    display=lambda v: f"{v:.0%}", default_enabled=False,
+))
+
+
+# --- Engine ------------------------------------------------------------------
+
+
+class _MetricEngine:
+    """Fused per-period state: one slot per enabled metric, updated together per day."""
+
+    __slots__ = ("updates", "states")
+
+    def __init__(self, metrics: list[Metric], states: Optional[list[Any]] = None) -> None:
+        self.updates = [m.update for m in metrics]
+        self.states = states if states is not None else [m.init() for m in metrics]
+
+    def add(self, day: date, count: int) -> None:
+        states = self.states
+        for i, update in enumerate(self.updates):
+            states[i] = update(states[i], day, count)
+
+    def result(self, metrics: list[Metric]) -> WrappedPeriod:
+        return WrappedPeriod(metrics={
+            m.name: m.finalize(s) for m, s in zip(metrics, self.states)
+        })
+
+
+class WrappedAggregator:
+    """Single-pass aggregator producing all-time, past-year and per-year wrapped metrics.
+
+    Days must arrive in ascending order; days at or before the last one seen are
+    ignored, so overlapping calendar windows can be fed as-is. Only the current
+    calendar year is live; finished years are reduced to their WrappedPeriod.
+    """
+
+    def __init__(self, past_year_start: date, metrics: Optional[list[Metric]] = None) -> None:
+        self.metrics = metrics if metrics is not None else enabled_metrics()
+        self.past_year_start = past_year_start
+        self.last_ordinal: Optional[int] = None
+        self.all_time = _MetricEngine(self.metrics)
+        self.past_year = _MetricEngine(self.metrics)
+        self.year: Optional[int] = None
+        self.year_acc = _MetricEngine(self.metrics)
+        self.finished_years: dict[str, WrappedPeriod] = {}
+
+    def add_day(self, date_str: str, count: int) -> None:
+        try:
+            day = date.fromisoformat(date_str[:10])
+        except ValueError:
+            return
+        ordinal = day.toordinal()
+        if self.last_ordinal is not None and ordinal <= self.last_ordinal:
+            return
+        self.last_ordinal = ordinal
+        self.all_time.add(day, count)
+        if day >= self.past_year_start:
+            self.past_year.add(day, count)
+        if day.year != self.year:
+            if self.year is not None:
+                self.finished_years[str(self.year)] = self.year_acc.result(self.metrics)
+            self.year = day.year
+            self.year_acc = _MetricEngine(self.metrics)
+        self.year_acc.add(day, count)
+
+    def add_days(self, days: Iterable[tuple[str, int]]) -> None:
+        for date_str, count in days:
+            self.add_day(date_str, count)
+
+    def add_weeks(self, weeks: list[Any]) -> None:
+        self.add_days(iter_calendar_days(weeks))
+
+    def results(self) -> dict[str, WrappedPeriod]:
+        """Return periods keyed "all_time", "past_year" and "YYYY" (empty if no days were fed)."""
+        if self.last_ordinal is None:
+            return {}
+        periods = {
+            "all_time": self.all_time.result(self.metrics),
+            "past_year": self.past_year.result(self.metrics),
+        }
+        periods.update(self.finished_years)
+        if self.year is not None:
+            periods[str(self.year)] = self.year_acc.result(self.metrics)
+        return periods
+
+    def to_state(self) -> dict[str, Any]:
+        """JSON-serializable snapshot, used to checkpoint the stream between runs.
+
+        The past-year period is not included: it moves every day, so callers
+        only snapshot after days that precede past_year_start.
+        """
+        return {
+            "metrics": [m.name for m in self.metrics],
+            "last_ordinal": self.last_ordinal,
+            "all_time": self.all_time.states,
+            "year": self.year,
+            "year_acc": self.year_acc.states,
+            "finished_years": {k: v.metrics for k, v in self.finished_years.items()},
+        }
+
+    def can_resume(self, state: dict[str, Any]) -> bool:
+        """True if state was produced with the same metric set as this aggregator."""
+        return state.get("metrics") == [m.name for m in self.metrics]
+
+    @classmethod
+    def from_state(
+        cls,
+        past_year_start: date,
+        state: dict[str, Any],
+        metrics: Optional[list[Metric]] = None,
+    ) -> "WrappedAggregator":
+        """Restore a snapshot; an empty or incompatible state yields a fresh aggregator."""
+        agg = cls(past_year_start, metrics)
+        if not state or not agg.can_resume(state):
+            return agg
+        agg.last_ordinal = state.get("last_ordinal")
+        agg.all_time = _MetricEngine(agg.metrics, state["all_time"])
+        agg.year = state.get("year")
+        agg.year_acc = _MetricEngine(agg.metrics, state["year_acc"])
+        agg.finished_years = {
+            k: WrappedPeriod(metrics=v) for k, v in (state.get("finished_years") or {}).items()
+        }
+        return agg
+
+
+class DailySeries:
+    """Per-day counts from the first day seen onward, in a compact array("I").
+
+    Fed from the same ascending day stream as WrappedAggregator (earlier or
+    repeated days are ignored; skipped days count as zero). Used for the
+    heatmap, which genuinely needs every day rather than O(1) summaries.
+    """
+
+    def __init__(self) -> None:
+        self.start_ordinal: Optional[int] = None
+        self.counts = array("I")
+
+    def add_day(self, date_str: str, count: int) -> None:
+        try:
+            ordinal = date.fromisoformat(date_str[:10]).toordinal()
+        except ValueError:
+            return
+        if self.start_ordinal is None:
+            self.start_ordinal = ordinal
+        index = ordinal - self.start_ordinal
+        if index < len(self.counts):
+            return
+        if index > len(self.counts):
+            self.counts.extend(array("I", bytes(self.counts.itemsize * (index - len(self.counts)))))
+        self.counts.append(max(0, count))
+
+    def add_weeks(self, weeks: list[Any]) -> None:
+        for date_str, count in iter_calendar_days(weeks):
+            self.add_day(date_str, count)
+
+    def calendar(self) -> Optional[ContributionCalendar]:
+        if self.start_ordinal is None:
+            return None
+        return ContributionCalendar(start=date.fromordinal(self.start_ordinal).isoformat(), counts=self.counts)
+
+    def to_state(self) -> dict[str, Any]:
+        return {"start_ordinal": self.start_ordinal, "counts": self.counts.tolist()}
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "DailySeries":
+        series = cls()
+        series.start_ordinal = state.get("start_ordinal")
+        series.counts = array("I", state.get("counts") or [])
+        return series